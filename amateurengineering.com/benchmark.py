@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the get_posts.py aggregation pipeline.
+
+Generates synthetic member corpora (Pelican and Hugo git repos, RSS and Atom feeds)
+at a configurable size, serves them from local bare git repos and a local HTTP server,
+then times each pipeline stage and reports throughput and peak memory.
+
+Run with `uv run benchmark.py` (or `python benchmark.py`) from this directory, e.g.
+    python benchmark.py --posts 10000 --body-kb 64 --memory
+"""
+
+import argparse
+import contextlib
+import functools
+import http.server
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import feeds
+import get_posts
+
+
+STAGES = ('sanitize', 'cover', 'rewrite', 'summary', 'dates', 'pelican', 'hugo', 'git', 'rss')
+BENCH_DOMAIN = "example.com"
+BENCH_MEMBER = {"author": "Bench", "url": f"https://{BENCH_DOMAIN}", "type": "pelican"}
+
+
+def legacy_rewrite_image_paths(body, domain):
+    """
+    The old three-pass rewrite from the Pelican and Hugo converters,
+    kept here as the baseline the shared engine is measured against.
+    """
+    img_pattern_md = re.compile(r'!\[([^\]]*)\]\((/[^)]+)\)')
+    img_pattern_html = re.compile(r'<img([^>]*)\s+src="(/[^"]+)"')
+    static_pattern = re.compile(r'\{static\}(/[^"\s)>]+)')
+    hugo_static_pattern = re.compile(r'\{\{<\s*figure\s+src="(/[^"]+)"')
+
+    def replace_img_md(match):
+        return f"![{match.group(1)}](https://{domain}{match.group(2)})"
+
+    def replace_img_html(match):
+        return f"<img{match.group(1)} src=\"https://{domain}{match.group(2)}\""
+
+    def replace_static(match):
+        return f"https://{domain}{match.group(1)}"
+
+    def replace_hugo_figure(match):
+        return f'{{{{< figure src="https://{domain}{match.group(1)}"'
+
+    body = img_pattern_md.sub(replace_img_md, body)
+    body = img_pattern_html.sub(replace_img_html, body)
+    body = static_pattern.sub(replace_static, body)
+    body = hugo_static_pattern.sub(replace_hugo_figure, body)
+    return body
+
+
+def legacy_summarize(html_text, limit):
+    """
+    The old regex summary (strip every tag from the whole body, collapse whitespace,
+    truncate), kept as the baseline for the streaming summarizer.
+    """
+    text = ' '.join(re.sub(r'<[^>]+>', '', html_text).split())
+    if len(text) > limit:
+        text = text[:limit] + "..."
+    return text
+
+
+LEGACY_DATE_FORMATS = [
+    '%a, %d %b %Y %H:%M:%S %z',
+    '%a, %d %b %Y %H:%M:%S %Z',
+    '%a, %d %b %Y %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%d %b %Y %H:%M:%S',
+]
+
+
+def legacy_parse_date(date_str):
+    """
+    The old date parsing (try each strptime format in turn for every entry), kept as
+    the baseline for the sniffing parsers.
+    """
+    for fmt in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+# Synthetic corpora
+
+def make_post_body(paragraphs, images_every=5):
+    """
+    Build a synthetic post body with a mix of every image reference style.
+    """
+    image_refs = [
+        '![A photo](/images/photo-{i}.jpg)',
+        '<img class="wide" src="/images/wide-{i}.png">',
+        '![Static]({{static}}/images/static-{i}.jpg)',
+        '{{{{< figure src="/images/figure-{i}.png" caption="Figure {i}" >}}}}',
+    ]
+    lines = []
+    for i in range(paragraphs):
+        lines.append(f"Paragraph {i} talks about soldering, woodwork and 8-bit computers. " * 4)
+        if i % images_every == 0:
+            lines.append(image_refs[(i // images_every) % len(image_refs)].format(i=i))
+    return "\n\n".join(lines)
+
+
+def make_sized_body(body_kb):
+    """
+    Build a post body of roughly body_kb kilobytes (each paragraph is about 270 bytes).
+    """
+    return make_post_body(max(1, body_kb * 1024 // 270))
+
+
+def make_title(i):
+    return f"Build log #{i}: Restoring a <b>1980s</b> pedestrian crossing light & controller?"
+
+
+def xml_escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def make_pelican_post(i, body):
+    return (
+        "---\n"
+        f"Title: {make_title(i)}\n"
+        f"Date: 2024-01-{i % 28 + 1:02d} 10:00\n"
+        "Category: Hardware\n"
+        "Tags: electronics, restoration\n"
+        f"Summary: Post number {i}\n"
+        "---\n\n"
+        f"{body}\n"
+    )
+
+
+def make_hugo_post(i, body):
+    if i % 2:
+        frontmatter = (
+            "+++\n"
+            f'title = "Hugo post {i}"\n'
+            f"date = 2024-02-{i % 28 + 1:02d}T10:00:00+10:00\n"
+            'tags = ["hardware", "sao"]\n'
+            'categories = ["projects"]\n'
+            "+++\n"
+        )
+    else:
+        frontmatter = (
+            "---\n"
+            f'title: "Hugo post {i}"\n'
+            f"date: 2024-02-{i % 28 + 1:02d}T10:00:00+10:00\n"
+            'tags: ["hardware", "sao"]\n'
+            f"description: Post number {i}\n"
+            "---\n"
+        )
+    return f"{frontmatter}\n{body}\n"
+
+
+def make_feed(posts, body, atom=False):
+    """
+    Build an RSS 2.0 or Atom feed with `posts` entries sharing the same HTML body.
+    """
+    escaped = xml_escape(body)
+    if atom:
+        entries = ''.join(
+            f'<entry><title>{xml_escape(make_title(i))}</title>'
+            f'<link href="https://{BENCH_DOMAIN}/posts/{i}/"/>'
+            f'<id>https://{BENCH_DOMAIN}/posts/{i}/</id>'
+            f'<updated>2024-03-{i % 28 + 1:02d}T10:00:00Z</updated>'
+            f'<content type="html">{escaped}</content></entry>'
+            for i in range(posts)
+        )
+        return ('<?xml version="1.0" encoding="utf-8"?>'
+                f'<feed xmlns="http://www.w3.org/2005/Atom"><title>Bench</title>{entries}</feed>')
+    items = ''.join(
+        f'<item><title>{xml_escape(make_title(i))}</title>'
+        f'<link>https://{BENCH_DOMAIN}/posts/{i}/</link>'
+        f'<guid>https://{BENCH_DOMAIN}/posts/{i}/</guid>'
+        f'<pubDate>Wed, {i % 28 + 1:02d} Oct 2024 14:30:00 +0000</pubDate>'
+        f'<description>{escaped}</description></item>'
+        for i in range(posts)
+    )
+    return ('<?xml version="1.0" encoding="utf-8"?>'
+            f'<rss version="2.0"><channel><title>Bench</title>{items}</channel></rss>')
+
+
+def write_posts(directory, posts, body, make_post):
+    """
+    Write `posts` synthetic markdown files into directory, returning their paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(posts):
+        path = os.path.join(directory, f"post-{i:06d}.md")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(make_post(i, body))
+        paths.append(path)
+    return paths
+
+
+def make_member_repo(workdir, posts, body, make_post, posts_path="content"):
+    """
+    Create a local bare git repo holding a synthetic member blog, plus a binary image
+    the sparse fetch should never download. Returns its file:// clone URL.
+    """
+    checkout = os.path.join(workdir, "member-checkout")
+    bare = os.path.join(workdir, "member.git")
+    git = ['git', '-c', 'user.name=Bench', '-c', 'user.email=bench@example.com']
+
+    write_posts(os.path.join(checkout, posts_path), posts, body, make_post)
+    os.makedirs(os.path.join(checkout, "content", "images"), exist_ok=True)
+    with open(os.path.join(checkout, "content", "images", "cover.jpg"), 'wb') as f:
+        f.write(os.urandom(512 * 1024))
+
+    subprocess.run([*git, 'init', '-q', '-b', 'main', checkout], check=True)
+    subprocess.run([*git, '-C', checkout, 'add', '-A'], check=True)
+    subprocess.run([*git, '-C', checkout, 'commit', '-q', '-m', 'Synthetic posts'], check=True)
+    subprocess.run(['git', 'clone', '-q', '--bare', checkout, bare], check=True)
+    # Let the partial/shallow clone protocol work over file://
+    subprocess.run(['git', '--git-dir', bare, 'config', 'uploadpack.allowFilter', 'true'], check=True)
+    subprocess.run(['git', '--git-dir', bare, 'config', 'uploadpack.allowAnySHA1InWant', 'true'], check=True)
+    return f"file://{bare}"
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve_directory(directory):
+    """
+    Serve a directory over HTTP on a free local port, standing in for members' sites.
+    """
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# Measurement
+
+def measure(name, items, nbytes, func, track_memory):
+    """
+    Run func once, returning a result row with elapsed time and (optionally) peak memory.
+    get_posts' per-file progress output is discarded so it doesn't dominate the timing.
+    """
+    if track_memory:
+        tracemalloc.start()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+    peak = None
+    if track_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"stage": name, "items": items, "bytes": nbytes, "seconds": elapsed, "peak": peak}
+
+
+def print_report(results):
+    print(f"\n{'stage':<24}{'items':>8}{'seconds':>10}{'items/s':>12}{'MB/s':>10}{'peak MB':>10}")
+    for row in results:
+        seconds = max(row["seconds"], 1e-9)
+        peak = f"{row['peak'] / 1e6:.1f}" if row["peak"] is not None else "-"
+        print(f"{row['stage']:<24}{row['items']:>8}{row['seconds']:>10.3f}"
+              f"{row['items'] / seconds:>12.0f}{row['bytes'] / seconds / 1e6:>10.1f}{peak:>10}")
+
+
+# Stages
+
+def bench_sanitize(args, workdir):
+    titles = [make_title(i) for i in range(args.posts)]
+    nbytes = sum(len(title) for title in titles)
+    return [measure("sanitize_filename", len(titles), nbytes,
+                    lambda: [get_posts.sanitize_filename(title) for title in titles], args.memory)]
+
+
+def bench_cover(args, workdir):
+    body = make_sized_body(args.body_kb)
+    return [measure("extract_last_image_url", args.posts, len(body) * args.posts,
+                    lambda: [get_posts.extract_last_image_url(body, BENCH_DOMAIN) for _ in range(args.posts)],
+                    args.memory)]
+
+
+def bench_rewrite(args, workdir):
+    """
+    Micro-benchmark the shared image rewrite against the legacy per-converter version, which
+    it should match in output and speed.
+    """
+    body = make_sized_body(args.body_kb)
+    if get_posts.rewrite_image_paths(body, BENCH_DOMAIN) != legacy_rewrite_image_paths(body, BENCH_DOMAIN):
+        raise SystemExit("rewrite_image_paths output differs from the legacy rewrite")
+
+    repeat = max(1, args.posts)
+    shared = min(timeit.repeat(lambda: get_posts.rewrite_image_paths(body, BENCH_DOMAIN), number=repeat, repeat=3))
+    legacy = min(timeit.repeat(lambda: legacy_rewrite_image_paths(body, BENCH_DOMAIN), number=repeat, repeat=3))
+    nbytes = len(body) * repeat
+    return [
+        {"stage": "rewrite (shared)", "items": repeat, "bytes": nbytes, "seconds": shared, "peak": None},
+        {"stage": "rewrite (legacy)", "items": repeat, "bytes": nbytes, "seconds": legacy, "peak": None},
+    ]
+
+
+def bench_summary(args, workdir):
+    """
+    Micro-benchmark the streaming HTML summarizer against the legacy regex summary,
+    on a full-content post of --body-kb.
+    """
+    html_body = "<p>" + make_sized_body(args.body_kb).replace('\n\n', '</p><p>') + "</p>"
+    repeat = max(1, args.posts)
+    streaming = min(timeit.repeat(lambda: feeds.summarize(html_body, 500), number=repeat, repeat=3))
+    legacy = min(timeit.repeat(lambda: legacy_summarize(html_body, 500), number=repeat, repeat=3))
+    nbytes = len(html_body) * repeat
+    return [
+        {"stage": "summary (streaming)", "items": repeat, "bytes": nbytes, "seconds": streaming, "peak": None},
+        {"stage": "summary (legacy)", "items": repeat, "bytes": nbytes, "seconds": legacy, "peak": None},
+    ]
+
+
+def bench_dates(args, workdir):
+    """
+    Micro-benchmark parsing a feed's worth of RFC 822 and RFC 3339 dates, with the
+    per-feed sniffer feeds.py uses, and with the legacy strptime loop.
+    """
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    dates = {
+        'rfc822': [format_datetime(base + timedelta(hours=i)) for i in range(args.posts)],
+        'rfc3339': [(base + timedelta(hours=i)).isoformat() for i in range(args.posts)],
+    }
+    results = []
+    for name, strings in dates.items():
+        nbytes = sum(len(s) for s in strings)
+
+        def sniffed():
+            sniffer = feeds.DateSniffer()
+            return [sniffer.parse(s) for s in strings]
+
+        for label, run in (("sniffed", sniffed),
+                           ("legacy", lambda: [legacy_parse_date(s) for s in strings])):
+            seconds = min(timeit.repeat(run, number=1, repeat=3))
+            results.append({"stage": f"dates {name} ({label})", "items": len(strings), "bytes": nbytes,
+                            "seconds": seconds, "peak": None})
+    return results
+
+
+def bench_converter(name, make_post, convert, args, workdir):
+    body = make_sized_body(args.body_kb)
+    posts = [(f"post-{i}.md", make_post(i, body)) for i in range(args.posts)]
+    nbytes = sum(len(content.encode('utf-8')) for _, content in posts)
+    return [measure(name, len(posts), nbytes,
+                    lambda: [convert(content, file_name, "Bench", BENCH_MEMBER["url"], BENCH_DOMAIN)
+                             for file_name, content in posts],
+                    args.memory)]
+
+
+def bench_pelican(args, workdir):
+    return bench_converter("convert_pelican", make_pelican_post, get_posts.convert_pelican_post, args, workdir)
+
+
+def bench_hugo(args, workdir):
+    return bench_converter("convert_hugo", make_hugo_post, get_posts.convert_hugo_post, args, workdir)
+
+
+def bench_git(args, workdir):
+    """
+    Time updating the mirror and listing the posts against a local bare repo, cold and warm,
+    then the manifest-driven sync into a content directory, cold and warm.
+    """
+    body = make_sized_body(args.body_kb)
+    repo_url = make_member_repo(workdir, args.posts, body, make_pelican_post)
+    nbytes = len(make_pelican_post(0, body)) * args.posts
+
+    # Keep benchmark mirrors out of the real sources directory
+    get_posts.MIRRORS_DIR = os.path.join(workdir, "mirrors")
+    content_dir = os.path.join(workdir, "content")
+
+    def sync():
+        posts, read_posts = get_posts.load_git_posts(repo_url, "/content")
+        get_posts.sync_markdown_files(posts, read_posts, content_dir, BENCH_MEMBER,
+                                      get_posts.convert_pelican_post, remove_failed=False)
+
+    return [
+        measure("git mirror (cold)", args.posts, nbytes,
+                lambda: get_posts.load_git_posts(repo_url, "/content"), args.memory),
+        measure("git mirror (warm)", args.posts, nbytes,
+                lambda: get_posts.load_git_posts(repo_url, "/content"), args.memory),
+        measure("sync + convert (cold)", args.posts, nbytes, sync, args.memory),
+        measure("sync + convert (warm)", args.posts, nbytes, sync, args.memory),
+    ]
+
+
+def bench_rss(args, workdir):
+    """
+    Time fetching and parsing RSS and Atom feeds from a local HTTP server,
+    then writing the entries out as Pelican markdown.
+    """
+    body = make_sized_body(args.body_kb)
+    feed_dir = os.path.join(workdir, "feeds")
+    os.makedirs(feed_dir, exist_ok=True)
+    for name, atom in (("rss.xml", False), ("atom.xml", True)):
+        with open(os.path.join(feed_dir, name), 'w', encoding='utf-8') as f:
+            f.write(make_feed(args.posts, body, atom=atom))
+
+    results = []
+    with serve_directory(feed_dir) as base_url:
+        for name in ("rss.xml", "atom.xml"):
+            nbytes = os.path.getsize(os.path.join(feed_dir, name))
+            entries = []
+            results.append(measure(f"fetch+parse {name}", args.posts, nbytes,
+                                   lambda: entries.extend(feeds.FeedReader().read(f"{base_url}/{name}").entries),
+                                   args.memory))
+
+            output_dir = os.path.join(workdir, f"rss-{name}")
+            os.makedirs(output_dir, exist_ok=True)
+            slugs = get_posts.SlugIndex()
+            results.append(measure(f"write {name} posts", len(entries), nbytes,
+                                   lambda: [get_posts.create_rss_markdown_file(entry, output_dir, "Bench",
+                                                                               BENCH_MEMBER["url"], slugs)
+                                            for entry in entries],
+                                   args.memory))
+    return results
+
+
+BENCHMARKS = {
+    'sanitize': bench_sanitize,
+    'cover': bench_cover,
+    'rewrite': bench_rewrite,
+    'summary': bench_summary,
+    'dates': bench_dates,
+    'pelican': bench_pelican,
+    'hugo': bench_hugo,
+    'git': bench_git,
+    'rss': bench_rss,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the post aggregation pipeline on synthetic members')
+    parser.add_argument('--posts', type=int, default=200,
+                        help='Posts per synthetic member/feed (default: 200)')
+    parser.add_argument('--body-kb', type=int, default=8,
+                        help='Approximate size of each post body in KB (default: 8)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES),
+                        help='Stages to run (default: all)')
+    parser.add_argument('--memory', action='store_true',
+                        help='Also report peak Python memory per stage (slows the timings down)')
+    args = parser.parse_args()
+
+    # Time the converters themselves: fetching and resizing covers would time the network,
+    # and write thumbnails into the real site
+    get_posts.configure_cover_thumbnails(False)
+
+    print(f"Benchmarking {args.posts} posts of ~{args.body_kb} KB: {', '.join(args.stages)}")
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ae-bench-") as workdir:
+        for stage in args.stages:
+            results.extend(BENCHMARKS[stage](args, workdir))
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Local thumbnails for post cover images.
+
+The index page shows every post's cover as a CSS background, so hotlinking the
+full-size image from the member's site costs a full-resolution download per post per
+page view. CoverCache fetches each cover once, keeps the original and its validators
+under sources/.covers, and writes small WebP (or JPEG) thumbnails into the site's
+static images, named from the URL and ETag so a changed image gets a new name.
+
+Resizing needs Pillow, which is optional: `uv run --with pillow get_posts.py`.
+Without it covers are left pointing at the original URLs.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse
+
+import fetcher
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+
+COVER_WIDTHS = (640, 1280)
+FETCH_TIMEOUT = 15
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+USER_AGENT = 'Amateur-Engineering-Aggregator/1.0'
+THUMBNAIL_NAME = re.compile(r'^(?P<name>[0-9a-f]{16})-\d+\.(?:webp|jpg)$')
+
+
+def cache_key(cover_url):
+    return hashlib.sha1(cover_url.encode('utf-8')).hexdigest()[:16]
+
+
+def write_atomic(path, data):
+    """Write bytes through a temporary file and a rename, safe against concurrent writers."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class CoverCache:
+    def __init__(self, cache_dir, output_dir, url_prefix, static_dir):
+        """
+        cache_dir holds downloaded originals and their validators, output_dir receives the
+        thumbnails, published under url_prefix. Covers that are already site paths
+        (like the placeholder) are read from static_dir, the Pelican content directory.
+        """
+        self.cache_dir = cache_dir
+        self.output_dir = output_dir
+        self.url_prefix = url_prefix.rstrip('/')
+        self.static_dir = static_dir
+        self.format = 'WEBP' if Image is not None and features.check('webp') else 'JPEG'
+        self.extension = 'webp' if self.format == 'WEBP' else 'jpg'
+
+    @property
+    def enabled(self):
+        return Image is not None
+
+    def thumbnail_urls(self, name):
+        return [f"{self.url_prefix}/{name}-{width}.{self.extension}" for width in COVER_WIDTHS]
+
+    def thumbnail_paths(self, name):
+        return [os.path.join(self.output_dir, f"{name}-{width}.{self.extension}") for width in COVER_WIDTHS]
+
+    def thumbnails(self, cover_url):
+        """
+        Return local thumbnail URLs for a cover, smallest first, or None if it can't be
+        fetched or resized (the caller should keep using the original URL).
+        Covers are only downloaded the first time they're seen.
+        """
+        if not self.enabled or not cover_url:
+            return None
+
+        key = cache_key(cover_url)
+        meta_path = os.path.join(self.cache_dir, f"{key}.json")
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            meta = {}
+
+        name = meta.get('name')
+        if name and all(os.path.exists(path) for path in self.thumbnail_paths(name)):
+            return self.thumbnail_urls(name)
+
+        fetched = self.fetch(cover_url, meta)
+        if fetched is None:
+            return None
+        data, validators = fetched
+
+        # Name thumbnails after the URL and its ETag (or content), so a replaced image busts caches
+        version = validators.get('etag') or hashlib.sha1(data).hexdigest()
+        name = hashlib.sha1(f"{cover_url}|{version}".encode('utf-8')).hexdigest()[:16]
+        if not self.resize(data, name):
+            return None
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_atomic(os.path.join(self.cache_dir, f"{key}.img"), data)
+        write_atomic(meta_path, json.dumps({'url': cover_url, 'name': name, **validators}).encode('utf-8'))
+        return self.thumbnail_urls(name)
+
+    def remove_unused(self, used_urls):
+        """
+        Delete thumbnails that no post uses any more (superseded by a changed image, or left
+        by a deleted post), and the cached originals they were made from, so they don't pile
+        up in the site. used_urls are the cover URLs current posts reference.
+        Returns the number of thumbnails removed.
+        """
+        prefix = f"{self.url_prefix}/"
+        used = {url[len(prefix):] for url in used_urls if url.startswith(prefix)}
+        used_names = {match.group('name') for match in map(THUMBNAIL_NAME.match, used) if match}
+
+        removed = 0
+        try:
+            thumbnails = os.listdir(self.output_dir)
+        except FileNotFoundError:
+            thumbnails = []
+        for filename in thumbnails:
+            if THUMBNAIL_NAME.match(filename) and filename not in used:
+                os.remove(os.path.join(self.output_dir, filename))
+                removed += 1
+
+        try:
+            cached = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            cached = []
+        for filename in cached:
+            if not filename.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.cache_dir, filename)
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    name = json.load(f).get('name')
+            except (OSError, json.JSONDecodeError):
+                name = None
+            if name not in used_names:
+                for path in (meta_path, f"{meta_path[:-len('.json')]}.img"):
+                    if os.path.exists(path):
+                        os.remove(path)
+        return removed
+
+    def fetch(self, cover_url, meta):
+        """
+        Get a cover's bytes: local covers from static_dir, remote ones over HTTP,
+        conditionally if we have the original cached. Returns (data, validators) or None.
+        """
+        parsed = urlparse(cover_url)
+        if not parsed.scheme and cover_url.startswith('/'):
+            local_path = os.path.join(self.static_dir, *cover_url.lstrip('/').split('/'))
+            try:
+                with open(local_path, 'rb') as f:
+                    return f.read(), {}
+            except OSError:
+                return None
+        if parsed.scheme not in ('http', 'https'):
+            return None
+
+        cached_path = os.path.join(self.cache_dir, f"{cache_key(cover_url)}.img")
+        headers = {'User-Agent': USER_AGENT}
+        if os.path.exists(cached_path):
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            request = urllib.request.Request(cover_url, headers=headers)
+            with fetcher.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+                data = response.read(MAX_IMAGE_BYTES + 1)
+                validators = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                }
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                with open(cached_path, 'rb') as f:
+                    return f.read(), {key: meta.get(key) for key in ('etag', 'last_modified') if meta.get(key)}
+            print(f"Could not fetch cover {cover_url}: HTTP {e.code}")
+            return None
+        except (urllib.error.URLError, OSError, ValueError, fetcher.HostUnavailable) as e:
+            print(f"Could not fetch cover {cover_url}: {e}")
+            return None
+
+        if len(data) > MAX_IMAGE_BYTES:
+            print(f"Cover {cover_url} is too large, leaving it hotlinked")
+            return None
+        return data, {key: value for key, value in validators.items() if value}
+
+    def resize(self, data, name):
+        """Write every thumbnail width for an image. Returns False if it isn't a readable image."""
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ('RGB', 'L'):
+                    image = image.convert('RGB')
+                os.makedirs(self.output_dir, exist_ok=True)
+                for width, path in zip(COVER_WIDTHS, self.thumbnail_paths(name)):
+                    thumbnail = image.copy()
+                    thumbnail.thumbnail((width, width * 4), Image.LANCZOS)
+                    out = io.BytesIO()
+                    if self.format == 'WEBP':
+                        thumbnail.save(out, 'WEBP', quality=75, method=4)
+                    else:
+                        thumbnail.save(out, 'JPEG', quality=80, optimize=True, progressive=True)
+                    write_atomic(path, out.getvalue())
+            return True
+        except Exception as e:
+            print(f"Could not resize cover image: {e}")
+            return False
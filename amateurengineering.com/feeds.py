@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+Feed ingestion shared by get_posts.py and rss_scraper.py.
+
+FeedReader fetches and parses each RSS/Atom feed at most once per run, however many
+consumers ask for it: the Pelican posts for RSS members and the aggregated posts
+both come from the same parsed entries, so they can't disagree about a post.
+
+Feeds are downloaded over a pooled keep-alive requests session and parsed as they
+download with a streaming XML parser. Feeds it can't handle (malformed XML, RSS 1.0/RDF)
+are fetched again and parsed with feedparser instead. The parsed entries are cached on
+disk next to the feed's validators (ETag / Last-Modified), so a feed that hasn't changed
+costs one 304 and every consumer still gets its entries, whether or not it saw the feed
+last run.
+"""
+
+import functools
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from html.parser import HTMLParser
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+
+import fetcher
+import instrumentation
+from posts import Post
+
+
+USER_AGENT = 'AmateurEngineering.com RSS Aggregator 1.0'
+ACCEPT = 'application/rss+xml, application/atom+xml, application/xml, text/xml'
+READ_CHUNK_SIZE = 64 * 1024
+# Keep-alive connections the session keeps open, enough for every concurrent fetch
+POOL_SIZE = 16
+# Bump when the cached entries' format changes, so old caches are refetched rather than misread
+CACHE_FORMAT = 2
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+ATOM_ENTRY_TAG = f'{ATOM}entry'
+CONTENT_ENCODED = '{http://purl.org/rss/1.0/modules/content/}encoded'
+DC = '{http://purl.org/dc/elements/1.1/}'
+RDF_ROOT_TAG = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}RDF'
+
+# Summaries: tags whose contents aren't text, tags that separate words, and how much HTML to parse at a time
+SUMMARY_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'math'}
+SUMMARY_BREAK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'figcaption', 'figure',
+    'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'img', 'li', 'ol', 'p', 'pre', 'section',
+    'table', 'td', 'th', 'tr', 'ul',
+}
+SUMMARY_FEED_SIZE = 4096
+
+# RFC 822 as RSS uses it: "Wed, 02 Oct 2024 14:30:00 +0000", day name and seconds optional
+RFC822_DATE = re.compile(
+    r'\s*(?:[A-Za-z]+,?\s*)?(\d{1,2})[\s-]+([A-Za-z]{3})[A-Za-z]*[\s-]+(\d{4}|\d{2})\s+'
+    r'(\d{1,2}):(\d{2})(?::(\d{2}))?(?:\.\d+)?\s*(?:([+-])(\d{2}):?(\d{2})|([A-Za-z]{1,5}))?\s*$')
+MONTHS = {name: number for number, name in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1)}
+# Zone names RFC 822 allows, plus the abbreviations feeds commonly use instead, in minutes from UTC
+ZONE_OFFSETS = {
+    'UT': 0, 'UTC': 0, 'GMT': 0, 'Z': 0,
+    'EST': -300, 'EDT': -240, 'CST': -360, 'CDT': -300, 'MST': -420, 'MDT': -360, 'PST': -480, 'PDT': -420,
+    'AKST': -540, 'AKDT': -480, 'HST': -600,
+    'BST': 60, 'WET': 0, 'WEST': 60, 'CET': 60, 'CEST': 120, 'EET': 120, 'EEST': 180,
+    'MSK': 180, 'JST': 540, 'KST': 540,
+    'AWST': 480, 'ACST': 570, 'ACDT': 630, 'AEST': 600, 'AEDT': 660, 'NZST': 720, 'NZDT': 780,
+}
+# Zone names we've already warned about, so a feed full of them only warns once
+unknown_zones = set()
+
+# Anything neither fast parser understands
+FALLBACK_DATE_FORMATS = [
+    '%Y-%m-%d %H:%M:%S%z',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y/%m/%d',
+    '%d %B %Y',
+    '%B %d, %Y',
+]
+
+
+@functools.lru_cache(maxsize=64)
+def fixed_offset(minutes):
+    return timezone(timedelta(minutes=minutes)) if minutes else timezone.utc
+
+
+def zone_offset(zone):
+    """
+    Minutes from UTC for a zone abbreviation. Unknown ones are taken as UTC, with a
+    warning the first time each is seen, since the time may be off by its offset.
+    """
+    offset = ZONE_OFFSETS.get(zone.upper())
+    if offset is None:
+        if zone.upper() not in unknown_zones:
+            unknown_zones.add(zone.upper())
+            print(f"Unknown timezone {zone!r} in feed date, assuming UTC")
+        return 0
+    return offset
+
+
+def parse_rfc822_date(date_str):
+    """Parse an RFC 822 date, returning an aware datetime or None if it isn't one."""
+    match = RFC822_DATE.match(date_str)
+    if not match:
+        return None
+    day, month_name, year, hour, minute, second, sign, offset_hours, offset_minutes, zone = match.groups()
+    month = MONTHS.get(month_name.lower())
+    if month is None:
+        return None
+    year = int(year)
+    if year < 100:
+        year += 2000 if year < 50 else 1900
+    if sign:
+        minutes = int(offset_hours) * 60 + int(offset_minutes)
+        offset = -minutes if sign == '-' else minutes
+    elif zone:
+        offset = zone_offset(zone)
+    else:
+        offset = 0
+    try:
+        return datetime(year, month, int(day), int(hour), int(minute), int(second or 0),
+                        tzinfo=fixed_offset(offset))
+    except ValueError:
+        return None
+
+
+def parse_rfc3339_date(date_str):
+    """Parse an RFC 3339 / ISO 8601 date, returning an aware datetime (UTC if no offset) or None."""
+    try:
+        parsed = datetime.fromisoformat(date_str.strip())
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_fallback_date(date_str):
+    """Try the odd formats some feeds use. Returns an aware datetime (UTC if no offset) or None."""
+    for fmt in FALLBACK_DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(date_str.strip(), fmt)
+        except ValueError:
+            continue
+        return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+    return None
+
+
+DATE_PARSERS = (parse_rfc822_date, parse_rfc3339_date, parse_fallback_date)
+
+
+class DateSniffer:
+    """
+    Parses the dates of one feed. Feeds use one date format throughout, so whichever
+    parser worked last is tried first and every other entry costs a single parse.
+    """
+
+    def __init__(self):
+        self.parsers = list(DATE_PARSERS)
+
+    def parse(self, date_str):
+        if not date_str:
+            return None
+        for i, parser in enumerate(self.parsers):
+            parsed = parser(date_str)
+            if parsed is not None:
+                if i:
+                    self.parsers.insert(0, self.parsers.pop(i))
+                return parsed
+        return None
+
+
+def parse_feed_date(date_str):
+    """
+    Parse an RSS/Atom date (RFC 822, RFC 3339 and a few common variants) on its own;
+    iter_feed_entries uses a DateSniffer per feed instead.
+    Returns a timezone-aware datetime in the feed's own offset (naive dates are taken
+    as UTC), or None if it can't be parsed. Use .astimezone(timezone.utc) to normalise.
+    """
+    if not date_str:
+        return None
+    # RFC 3339 dates start with the year, RFC 822 ones with a day name or day number
+    if date_str.lstrip()[:4].isdigit():
+        return parse_rfc3339_date(date_str) or parse_fallback_date(date_str)
+    return parse_rfc822_date(date_str) or parse_fallback_date(date_str)
+
+
+class _SummaryFull(Exception):
+    """Raised from inside SummaryParser to stop parsing once the summary is long enough."""
+
+
+class SummaryParser(HTMLParser):
+    """
+    Collects the visible text of an HTML fragment with entities decoded and whitespace
+    collapsed, skipping <script>/<style> bodies and treating block tags as word breaks.
+    Stops (raising _SummaryFull) as soon as it has more than limit characters.
+    """
+
+    def __init__(self, limit):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.pieces = []
+        self.length = 0
+        self.skip_depth = 0
+        self.space_pending = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SUMMARY_SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in SUMMARY_BREAK_TAGS:
+            self.space_pending = True
+
+    def handle_endtag(self, tag):
+        if tag in SUMMARY_SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in SUMMARY_BREAK_TAGS:
+            self.space_pending = True
+
+    def handle_data(self, data):
+        if self.skip_depth or not data:
+            return
+        if data[0].isspace():
+            self.space_pending = True
+        for word in data.split():
+            if self.space_pending and self.length:
+                self.pieces.append(' ')
+                self.length += 1
+            self.pieces.append(word)
+            self.length += len(word)
+            self.space_pending = True
+            if self.length > self.limit:
+                raise _SummaryFull()
+        self.space_pending = data[-1].isspace()
+
+
+def summarize(html_text, limit):
+    """
+    Plain-text summary of an entry's HTML content, at most limit characters. Longer text
+    is cut at the last word boundary with "..." appended. The HTML is parsed a slice at a
+    time and parsing stops once there's enough text, so a long post costs about as much
+    as a short one.
+    """
+    parser = SummaryParser(limit)
+    try:
+        for start in range(0, len(html_text or ''), SUMMARY_FEED_SIZE):
+            parser.feed(html_text[start:start + SUMMARY_FEED_SIZE])
+        parser.close()
+    except _SummaryFull:
+        pass
+
+    text = ''.join(parser.pieces)
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(' ', 0, limit + 1)
+    if cut < limit // 2:
+        # One enormous word (a URL, say), cut it mid-word rather than lose most of the summary
+        cut = limit
+    return text[:cut].rstrip(' ,;:') + "..."
+
+
+def element_text(item, *paths):
+    """Text of the first of paths that exists under item (even if empty), or None."""
+    for path in paths:
+        elem = item.find(path)
+        if elem is not None:
+            return elem.text or ''
+    return None
+
+
+def parse_feed_item(item, is_atom, parse_date=parse_feed_date):
+    """
+    Turn a single RSS <item> or Atom <entry> element into a Post with its title, url,
+    guid, content, author (as the feed names them) and date, parsed with parse_date.
+    Returns None if the item has no usable title.
+    """
+    entry = {}
+
+    if is_atom:
+        entry['title'] = element_text(item, f'.//{ATOM}title') or 'Untitled'
+
+        # The post itself is the alternate link; others point at comments, the feed, etc.
+        links = item.findall(f'{ATOM}link')
+        link_elem = next((link for link in links if link.get('rel', 'alternate') == 'alternate'),
+                         links[0] if links else None)
+        entry['link'] = link_elem.get('href', '') if link_elem is not None else ''
+
+        entry['content'] = element_text(item, f'.//{ATOM}content', f'.//{ATOM}summary') or ''
+        entry['guid'] = (element_text(item, f'{ATOM}id') or '').strip()
+        entry['date'] = element_text(item, f'.//{ATOM}published', f'.//{ATOM}updated') or ''
+        entry['author'] = (element_text(item, f'{ATOM}author/{ATOM}name') or '').strip()
+
+    else:
+        title = element_text(item, 'title')
+        guid = (element_text(item, 'guid') or '').strip()
+        description = element_text(item, 'description')
+        if title:
+            entry['title'] = title
+        elif guid:
+            # No title, make one from the last part of the GUID
+            entry['title'] = f"Post {guid.split('/')[-1]}" if '/' in guid else f"Post {guid}"
+        elif description:
+            # Or from the first 50 characters of the description, without HTML
+            desc_text = re.sub(r'<[^>]+>', '', description).strip()[:50]
+            entry['title'] = desc_text + ('...' if len(desc_text) == 50 else '') if desc_text else 'Untitled Post'
+        else:
+            entry['title'] = 'Untitled Post'
+
+        entry['link'] = element_text(item, 'link') or ''
+        entry['guid'] = guid
+
+        # Try description first, then content:encoded
+        entry['content'] = description if description is not None else element_text(item, f'.//{CONTENT_ENCODED}') or ''
+        entry['date'] = element_text(item, 'pubDate', f'.//{DC}date') or ''
+        entry['author'] = (element_text(item, f'{DC}creator', 'author') or '').strip()
+
+    # Clean up HTML entities and content
+    entry['title'] = html.unescape(entry['title']).strip() if entry['title'] else ''
+    entry['content'] = html.unescape(entry['content']).strip() if entry['content'] else ''
+    entry['link'] = entry['link'].strip()
+    entry['date'] = entry['date'].strip()
+
+    # Skip entries without title (but now we should always have some kind of title)
+    if not entry['title']:
+        return None
+    return Post(title=entry['title'], date=parse_date(entry['date']), url=entry['link'], guid=entry['guid'],
+                content=entry['content'], author=entry['author'])
+
+
+class UnsupportedFeed(Exception):
+    """Raised by iter_feed_entries for well-formed feeds it doesn't understand, like RSS 1.0 (RDF)."""
+
+
+def iter_feed_entries(stream, max_entries=None):
+    """
+    Incrementally parse an RSS/Atom feed from a binary stream, yielding entries as
+    each <item>/<entry> closes. Processed elements are dropped from the tree so memory
+    stays flat however big the feed is, and reading stops once max_entries are yielded.
+    Raises ET.ParseError for malformed XML and UnsupportedFeed for RSS 1.0.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    open_elements = []
+    yielded = 0
+    dates = DateSniffer()
+
+    while max_entries is None or yielded < max_entries:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            parser.close()
+            break
+        instrumentation.count("bytes_fetched", len(chunk))
+        parser.feed(chunk)
+
+        for event, elem in parser.read_events():
+            if event == 'start':
+                if not open_elements and elem.tag == RDF_ROOT_TAG:
+                    raise UnsupportedFeed("RSS 1.0 (RDF) feed")
+                open_elements.append(elem)
+                continue
+
+            open_elements.pop()
+            if elem.tag not in ('item', ATOM_ENTRY_TAG):
+                continue
+
+            entry = parse_feed_item(elem, elem.tag == ATOM_ENTRY_TAG, dates.parse)
+
+            # Free the processed item
+            elem.clear()
+            if open_elements:
+                open_elements[-1].remove(elem)
+
+            if entry:
+                yield entry
+                yielded += 1
+                if max_entries is not None and yielded >= max_entries:
+                    return
+
+
+def feedparser_entries(data, max_entries=None):
+    """
+    Parse a whole feed with feedparser into Posts, for the feeds iter_feed_entries can't
+    read. Content and dates are picked the same way as parse_feed_item.
+    """
+    parsed = feedparser.parse(data)
+    is_atom = parsed.get('version', '').startswith('atom')
+    entries = []
+    for item in parsed.entries[:max_entries]:
+        content = item.get('content')
+        content = content[0].get('value', '') if content else None
+        summary = item.get('summary')
+        if is_atom:
+            content = content or summary
+        else:
+            content = summary if summary is not None else content
+
+        date = parse_feed_date(item.get('published') or item.get('updated') or '')
+        parsed_date = item.get('published_parsed') or item.get('updated_parsed')
+        if date is None and parsed_date:
+            date = datetime(*parsed_date[:6], tzinfo=timezone.utc)
+
+        entries.append(Post(
+            title=(item.get('title') or '').strip() or 'Untitled Post',
+            date=date,
+            url=(item.get('link') or '').strip(),
+            guid=(item.get('id') or '').strip(),
+            content=(content or '').strip(),
+            author=(item.get('author') or '').strip(),
+        ))
+    if not entries and parsed.get('bozo'):
+        raise parsed.bozo_exception
+    return entries
+
+
+def make_session(pool_size=POOL_SIZE):
+    """A requests session keeping up to pool_size keep-alive connections open per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def covers(held_max, wanted_max):
+    """True if entries read with a limit of held_max include the first wanted_max (None is the whole feed)."""
+    return held_max is None or (wanted_max is not None and wanted_max <= held_max)
+
+
+class FeedResult:
+    """
+    A feed as read this run. entries are Posts in feed order; not_modified is True when the
+    server said the feed hasn't changed since last run (the entries then come from the
+    cache). version is the feed's ETag or Last-Modified, if it has one, so consumers can
+    tell whether it's the same feed they last processed. error is set, with no entries,
+    if the feed couldn't be fetched or parsed.
+    """
+
+    def __init__(self, url, entries, not_modified=False, error=None, max_entries=None, version=None):
+        self.url = url
+        self.entries = entries
+        self.not_modified = not_modified
+        self.error = error
+        self.max_entries = max_entries
+        self.version = version
+
+    def limited(self, max_entries):
+        if max_entries is None or max_entries >= len(self.entries):
+            return self
+        return FeedResult(self.url, self.entries[:max_entries], self.not_modified, self.error,
+                          max_entries, self.version)
+
+
+class FeedReader:
+    """
+    Fetches and parses feeds at most once each per run, for any number of threads.
+    With a cache_dir, each feed's validators and parsed entries are kept between runs
+    (one JSON file per feed) and requests are conditional. Requests go through session,
+    a pooled requests session (make_session() if none is given).
+    """
+
+    def __init__(self, cache_dir=None, session=None):
+        self.cache_dir = cache_dir
+        self.session = session or make_session()
+        self._lock = threading.Lock()
+        self._feed_locks = {}
+        self._results = {}
+
+    def _cache_path(self, url):
+        return os.path.join(self.cache_dir, f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.json")
+
+    def _load_cached(self, url):
+        """
+        The cached copy of a feed, or None if there isn't one (or it's for a different URL,
+        or was written by a version whose entries this one can't read).
+        """
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(url), 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not isinstance(cached, dict) or cached.get('url') != url or cached.get('format') != CACHE_FORMAT:
+            return None
+        try:
+            cached['entries'] = [Post.from_dict(entry) for entry in cached.get('entries', [])]
+        except (TypeError, KeyError, ValueError):
+            return None
+        return cached
+
+    def _save_cached(self, url, response_headers, entries, max_entries):
+        """Write a feed's validators and entries atomically. Feeds without validators aren't cached."""
+        if not self.cache_dir:
+            return
+        validators = {
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+        }
+        path = self._cache_path(url)
+        if not any(validators.values()):
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'format': CACHE_FORMAT, **validators, 'max_entries': max_entries,
+                       'entries': [entry.to_dict() for entry in entries]},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _feed_lock(self, url):
+        with self._lock:
+            return self._feed_locks.setdefault(url, threading.Lock())
+
+    def read(self, url, max_entries=None):
+        """
+        Return the FeedResult for a feed, fetching and parsing it only if it hasn't been
+        read this run (or was read with a smaller max_entries). Concurrent callers for the
+        same feed wait for the first one's result.
+        """
+        with self._feed_lock(url):
+            result = self._results.get(url)
+            if result is None or not covers(result.max_entries, max_entries):
+                result = self._fetch(url, max_entries)
+                self._results[url] = result
+            else:
+                instrumentation.count("feed_reuses")
+        return result.limited(max_entries)
+
+    def _fetch_with_feedparser(self, url, max_entries):
+        """
+        Fetch a feed the streaming parser gave up on again, whole, and parse it with
+        feedparser. Returns (entries, response headers).
+        """
+        instrumentation.count("feedparser_fallbacks")
+        response = fetcher.session_get(self.session, url, headers={'User-Agent': USER_AGENT, 'Accept': ACCEPT})
+        response.raise_for_status()
+        instrumentation.count("bytes_fetched", len(response.content))
+        return feedparser_entries(response.content, max_entries), response.headers
+
+    def _fetch(self, url, max_entries):
+        headers = {'User-Agent': USER_AGENT, 'Accept': ACCEPT}
+        cached = self._load_cached(url)
+        if cached is not None and covers(cached.get('max_entries'), max_entries):
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            with instrumentation.span("fetch_parse"):
+                with fetcher.session_get(self.session, url, headers=headers, stream=True) as response:
+                    if response.status_code == 304:
+                        if cached is None:
+                            raise ValueError(f"{url} answered 304 Not Modified but there's no cached copy")
+                        instrumentation.count("cache_hits")
+                        return FeedResult(url, cached['entries'], not_modified=True,
+                                          max_entries=cached.get('max_entries'),
+                                          version=cached.get('etag') or cached.get('last_modified'))
+                    response.raise_for_status()
+                    response.raw.decode_content = True
+                    try:
+                        entries = list(iter_feed_entries(response.raw, max_entries))
+                        response_headers = response.headers
+                    except (ET.ParseError, UnsupportedFeed) as e:
+                        entries = None
+                        print(f"Parsing {url} with feedparser: {e}")
+                if entries is None:
+                    entries, response_headers = self._fetch_with_feedparser(url, max_entries)
+        except Exception as e:
+            return FeedResult(url, [], error=str(e) or type(e).__name__, max_entries=max_entries)
+
+        # A feed that ran out before the limit was read in full
+        if max_entries is not None and len(entries) < max_entries:
+            max_entries = None
+        self._save_cached(url, response_headers, entries, max_entries)
+        return FeedResult(url, entries, max_entries=max_entries,
+                          version=response_headers.get('ETag') or response_headers.get('Last-Modified'))
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Timeouts, retries and a circuit breaker for everything the pipeline fetches.
+
+Every outbound request (feeds, members.json, cover images, git) goes through here, so
+one slow or dead member can't stall the whole run:
+    - every request has a timeout (git commands too)
+    - transient failures (connection errors, timeouts, 429 and 5xx) are retried with
+      exponential backoff and jitter
+    - a host that keeps failing has its circuit opened and is skipped for a cooldown
+      period; the breaker state is kept on disk so the next run skips it too
+
+Only transient failures count towards the breaker, so a member with a deleted repo or
+a 404 feed doesn't get their whole host skipped. Git remotes are tracked per repository
+rather than per host, so a few slow repos on github.com don't skip every other member
+hosted there.
+"""
+
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse
+
+import instrumentation
+
+
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+GIT_TIMEOUT = 300
+# Ref lookups (ls-remote) only exchange a few hundred bytes
+GIT_REF_TIMEOUT = 30
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 6 * 60 * 60
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# git reports network trouble on stderr; anything else (bad repo, bad ref) isn't worth retrying
+TRANSIENT_GIT_ERROR = re.compile(
+    r'Could not resolve host|Connection (?:reset|refused|timed out)|timed out|early EOF|'
+    r'RPC failed|unexpected disconnect|The requested URL returned error: (?:429|5\d\d)|'
+    r'Failed to connect|SSL_ERROR|gnutls_handshake', re.IGNORECASE)
+
+
+class HostUnavailable(Exception):
+    """Raised instead of making a request to a host whose circuit is open."""
+
+
+class TransientError(Exception):
+    """A failure worth retrying, wrapping the original error."""
+
+
+class CircuitBreaker:
+    def __init__(self, path=None, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.path = path
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._hosts = self._load()
+
+    def _load(self):
+        """Load the breaker state, starting with every circuit closed if the file is missing or corrupt."""
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                hosts = json.load(f)
+            return hosts if isinstance(hosts, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save(self):
+        """Write the state atomically. Called with the lock held."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._hosts, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def allow(self, host):
+        """Return True if requests to host may go ahead (its circuit is closed or the cooldown is over)."""
+        with self._lock:
+            state = self._hosts.get(host)
+            return not state or state.get('open_until', 0) <= time.time()
+
+    def record_success(self, host):
+        with self._lock:
+            if self._hosts.pop(host, None) is not None:
+                self._save()
+
+    def record_failure(self, host):
+        """Count a failed operation against host, opening its circuit once it reaches the threshold."""
+        with self._lock:
+            state = self._hosts.setdefault(host, {'failures': 0})
+            state['failures'] += 1
+            if state['failures'] >= self.threshold:
+                state['open_until'] = time.time() + self.cooldown
+                instrumentation.count('circuits_opened')
+            self._save()
+
+
+# In memory unless a script loads a persistent one with load_circuit_breaker()
+breaker = CircuitBreaker()
+
+
+def load_circuit_breaker(path):
+    """Use a circuit breaker persisted at path for the rest of the process."""
+    global breaker
+    breaker = CircuitBreaker(path)
+    return breaker
+
+
+def url_host(url):
+    return urlparse(url).hostname or url
+
+
+def git_remote_key(remote_url):
+    """Circuit breaker key for a git remote: its host and repository path (e.g. github.com/owner/repo)."""
+    scp_like = re.match(r'^[\w.-]+@([\w.-]+):(?!//)(.*)$', remote_url)
+    if scp_like:
+        host, path = scp_like.groups()
+    else:
+        parsed = urlparse(remote_url)
+        host, path = parsed.hostname or '', parsed.path
+    path = path.strip('/')
+    if path.endswith('.git'):
+        path = path[:-len('.git')]
+    return f"{host}/{path}" if path else (host or remote_url)
+
+
+def git_subcommand(args):
+    """The git subcommand in args (e.g. "fetch"), skipping global options like --git-dir <path>."""
+    args = iter(args)
+    for arg in args:
+        if arg in ('--git-dir', '-C', '-c'):
+            next(args, None)
+        elif not arg.startswith('-'):
+            return arg
+    return ''
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before retry number attempt (1-based): exponential with full jitter, or Retry-After."""
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def parse_retry_after(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def with_retries(operation, host, description):
+    """
+    Run operation() against host (or a git repository, see git_remote_key), retrying
+    TransientError with backoff and keeping its circuit breaker up to date. Raises
+    HostUnavailable without calling operation if the circuit is open, and the original
+    error once retries are used up.
+    """
+    if not breaker.allow(host):
+        instrumentation.count('circuit_skips')
+        raise HostUnavailable(f"Skipping {description}: {host} has failed repeatedly, circuit open")
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            result = operation()
+        except TransientError as e:
+            cause = e.__cause__ or e
+            if attempt == MAX_ATTEMPTS:
+                breaker.record_failure(host)
+                raise cause
+            delay = backoff_delay(attempt, getattr(e, 'retry_after', None))
+            print(f"Retrying {description} in {delay:.1f}s after: {e}")
+            instrumentation.count('retries')
+            time.sleep(delay)
+        else:
+            breaker.record_success(host)
+            return result
+
+
+def urlopen(request, timeout=READ_TIMEOUT):
+    """
+    urllib.request.urlopen with a timeout, retries and the circuit breaker.
+    HTTP errors that aren't transient (including 304) are raised straight away.
+    """
+    url = request.full_url if isinstance(request, urllib.request.Request) else request
+
+    def attempt():
+        try:
+            return urllib.request.urlopen(request, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code not in RETRYABLE_STATUS:
+                raise
+            error = TransientError(str(e))
+            error.retry_after = parse_retry_after(e.headers.get('Retry-After'))
+            raise error from e
+        except (urllib.error.URLError, socket.timeout, ConnectionError) as e:
+            raise TransientError(str(e)) from e
+
+    return with_retries(attempt, url_host(url), url)
+
+
+def session_get(session, url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), **kwargs):
+    """
+    requests' Session.get with separate connect/read timeouts, retries and the circuit breaker.
+    Returns the response; raising for non-transient error statuses is left to the caller.
+    """
+    import requests
+
+    def attempt():
+        try:
+            response = session.get(url, timeout=timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            raise TransientError(str(e)) from e
+        if response.status_code in RETRYABLE_STATUS:
+            error = TransientError(f"HTTP {response.status_code} for {url}")
+            error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as http_error:
+                raise error from http_error
+        return response
+
+    return with_retries(attempt, url_host(url), url)
+
+
+def run_git(args, remote_url, timeout=GIT_TIMEOUT, input=None):
+    """
+    Run a git command that talks to remote_url, with a time limit, retries for
+    network trouble and the circuit breaker (keyed on the repository, see
+    git_remote_key). Returns the CompletedProcess; raises
+    CalledProcessError or TimeoutExpired if it still fails.
+    """
+    def attempt():
+        try:
+            return subprocess.run(['git', *args], input=input, check=True, capture_output=True,
+                                  text=True, timeout=timeout)
+        except subprocess.CalledProcessError as e:
+            if TRANSIENT_GIT_ERROR.search(e.stderr or ''):
+                raise TransientError((e.stderr or str(e)).strip()) from e
+            raise
+
+    key = git_remote_key(remote_url)
+    try:
+        return with_retries(attempt, key, f"git {git_subcommand(args)} {remote_url}")
+    except subprocess.TimeoutExpired:
+        # A hung remote isn't retried, that would just double the wait
+        breaker.record_failure(key)
+        raise
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Front matter parsing for member posts.
+
+Handles the three formats we pull in:
+    - Pelican "Key: value" metadata between --- lines
+    - Hugo YAML front matter between --- lines
+    - Hugo TOML front matter between +++ lines (parsed with the stdlib tomllib)
+
+Most posts only have flat "key: value" front matter, so that case goes through a
+fast path. Anything nested (block lists, multi-line strings, tables) goes through a small
+built-in block parser that covers what Hugo themes actually use; it deliberately doesn't
+use PyYAML even when that's installed, so a post converts the same everywhere (PyYAML
+would, for one, turn "yes" into True). Either way the result is a PostMetadata, so both
+converters read titles, dates, tags and categories the same way.
+"""
+
+import json
+import re
+import tomllib
+from datetime import date, datetime
+
+
+# A flat YAML line: unindented key, a value on the same line that doesn't open a block
+FLAT_YAML_LINE = re.compile(r'^[A-Za-z0-9_.-]+\s*:(?:\s+(?![|>&*!{])\S.*)?$')
+INLINE_LIST_ITEM = re.compile(r'\s*(?:"((?:[^"\\]|\\.)*)"|\'((?:[^\']|\'\')*)\'|([^,]+))')
+
+
+def split_front_matter(content):
+    """
+    Split a post into (delimiter, front matter text, body).
+    Returns None if the post doesn't start with a --- or +++ front matter block.
+    """
+    for delimiter in ('---', '+++'):
+        if content.startswith(delimiter):
+            parts = content.split(delimiter, 2)
+            if len(parts) < 3:
+                return None
+            return delimiter, parts[1].strip(), parts[2].strip()
+    return None
+
+
+def decode_scalar(value):
+    """
+    Decode a single-line YAML scalar: strip quotes (handling escapes) and parse inline [lists].
+    Anything else is returned as the plain string.
+    """
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value[1:-1]
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    if value.startswith('[') and value.endswith(']'):
+        items = []
+        for double, single, bare in INLINE_LIST_ITEM.findall(value[1:-1]):
+            if double:
+                items.append(decode_scalar(f'"{double}"'))
+            elif single:
+                items.append(single.replace("''", "'"))
+            elif bare.strip():
+                items.append(bare.strip())
+        return items
+    if value.startswith('#'):
+        return ''
+    # Drop trailing comments: "value # comment"
+    return value.split(' #', 1)[0].rstrip()
+
+
+def _parse_flat_yaml(text):
+    """
+    Fast path for flat front matter: one "key: value" per line, nothing nested.
+    Returns the fields, or None if the text isn't flat and needs the block parser.
+    """
+    fields = {}
+    for line in text.split('\n'):
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        if not FLAT_YAML_LINE.match(line):
+            return None
+        key, value = line.split(':', 1)
+        fields[key.strip()] = decode_scalar(value)
+    return fields
+
+
+def _parse_yaml_block(lines):
+    """
+    Minimal YAML block parser. Handles mappings, nested mappings, "- item" lists
+    and | / > block scalars.
+    """
+    fields = {}
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        if not line.strip() or line.lstrip().startswith('#') or ':' not in line:
+            continue
+        key, value = line.split(':', 1)
+        key = key.strip()
+        value = value.strip()
+
+        # Collect the indented lines that belong to this key
+        block = []
+        while i < len(lines) and (not lines[i].strip() or lines[i][:1] in (' ', '\t')
+                                  or (lines[i].startswith('- ') and not value)):
+            block.append(lines[i])
+            i += 1
+        while block and not block[-1].strip():
+            block.pop()
+
+        if value in ('|', '|-', '>', '>-'):
+            indent = min((len(b) - len(b.lstrip()) for b in block if b.strip()), default=0)
+            text_lines = [b[indent:] for b in block]
+            fields[key] = '\n'.join(text_lines) if value.startswith('|') else ' '.join(
+                b.strip() for b in text_lines if b.strip())
+        elif value:
+            fields[key] = decode_scalar(value)
+        elif block and block[0].lstrip().startswith('- '):
+            fields[key] = [decode_scalar(b.lstrip()[2:]) for b in block if b.lstrip().startswith('- ')]
+        elif block:
+            indent = min(len(b) - len(b.lstrip()) for b in block if b.strip())
+            fields[key] = _parse_yaml_block([b[indent:] for b in block])
+        else:
+            fields[key] = ''
+    return fields
+
+
+def parse_yaml_front_matter(text):
+    """Parse YAML front matter into an ordered dict of fields."""
+    flat = _parse_flat_yaml(text)
+    if flat is not None:
+        return flat
+    return _parse_yaml_block(text.split('\n'))
+
+
+def parse_toml_front_matter(text):
+    """Parse TOML front matter into an ordered dict of fields."""
+    return tomllib.loads(text)
+
+
+def parse_pelican_front_matter(text):
+    """
+    Parse Pelican "Key: value" metadata, keeping values as the raw strings Pelican expects.
+    Indented continuation lines are joined onto the previous value.
+    """
+    fields = {}
+    last_key = None
+    for line in text.split('\n'):
+        if line[:1] in (' ', '\t') and last_key and line.strip():
+            fields[last_key] = f"{fields[last_key]} {line.strip()}".strip()
+        elif ':' in line:
+            key, value = line.split(':', 1)
+            last_key = key.strip()
+            fields[last_key] = value.strip()
+    return fields
+
+
+def as_text(value):
+    """Render a parsed front matter value as the string Pelican metadata needs."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ', '.join(as_text(item) for item in value)
+    return str(value).strip()
+
+
+def as_list(value):
+    """Normalise a tags/categories value (list, "[a, b]" string or "a, b" string) to a list of strings."""
+    if value is None or value == '':
+        return []
+    if isinstance(value, str):
+        value = decode_scalar(value) if value.strip().startswith('[') else value.split(',')
+        if isinstance(value, str):
+            value = [value]
+    return [text for text in (as_text(item) for item in value) if text]
+
+
+class PostMetadata:
+    """
+    Typed view of a post's front matter. `fields` keeps every original field in order;
+    the properties give the normalised values both converters need.
+    """
+
+    def __init__(self, fields, format):
+        self.fields = fields
+        self.format = format
+
+    @classmethod
+    def from_pelican(cls, text):
+        return cls(parse_pelican_front_matter(text), 'pelican')
+
+    @classmethod
+    def from_hugo(cls, delimiter, text):
+        if delimiter == '+++':
+            return cls(parse_toml_front_matter(text), 'toml')
+        return cls(parse_yaml_front_matter(text), 'yaml')
+
+    def raw(self, *keys):
+        """Return the first present value for any of keys, matching exactly then case-insensitively."""
+        for key in keys:
+            if key in self.fields and self.fields[key] not in (None, ''):
+                return self.fields[key]
+        lowered = {key.lower(): value for key, value in self.fields.items()}
+        for key in keys:
+            if lowered.get(key.lower()) not in (None, ''):
+                return lowered[key.lower()]
+        return None
+
+    def text(self, *keys):
+        return as_text(self.raw(*keys))
+
+    @property
+    def title(self):
+        return self.text('title')
+
+    @property
+    def date(self):
+        return self.text('date')
+
+    @property
+    def modified(self):
+        return self.text('lastmod', 'modified')
+
+    @property
+    def summary(self):
+        return self.text('summary', 'description')
+
+    @property
+    def tags(self):
+        return as_list(self.raw('tags'))
+
+    @property
+    def categories(self):
+        return as_list(self.raw('categories', 'category'))
+
+    @property
+    def draft(self):
+        value = self.raw('draft')
+        return value is True or as_text(value).lower() == 'true'
+
+    def set(self, key, value):
+        """Set a field, replacing any case-variant of the key in place so it isn't written twice."""
+        for existing in list(self.fields):
+            if existing.lower() == key.lower() and existing != key:
+                self.fields = {key if k == existing else k: v for k, v in self.fields.items()}
+        self.fields[key] = value
+
+
+def format_pelican_metadata(fields):
+    """Render fields as a Pelican "Key: value" block, flattening lists and multi-line values."""
+    lines = []
+    for key, value in fields.items():
+        text = ' '.join(as_text(value).split('\n')).strip()
+        lines.append(f"{key}: {text}")
+    return f"---\n{chr(10).join(lines)}\n---"
@@ -23,18 +23,42 @@ import os
 import subprocess
 import shutil
 import argparse
-import urllib.request
 from urllib.parse import urlparse
 import re
-import xml.etree.ElementTree as ET
-import html
-from datetime import datetime
+import threading
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import fetcher
+import instrumentation
+import rss_scraper
+from cover_images import CoverCache
+from feeds import FeedReader, summarize
+from frontmatter import PostMetadata, split_front_matter
+from post_index import PRIORITY_FEED, PRIORITY_GIT, PostIndex, SeenPosts
+from posts import Post
 
 
 
 MEMBERS_JSON_URL = "https://raw.githubusercontent.com/obsoletenerd/amateur-engineering/refs/heads/main/contributors.json"
 OUTPUT_BASE_DIR = "content"
 SOURCES_DIR = "sources"
+MIRRORS_DIR = os.path.join(SOURCES_DIR, ".mirrors")
+FEED_CACHE_DIR = os.path.join(SOURCES_DIR, ".feeds")
+POST_INDEX_FILE = os.path.join(SOURCES_DIR, ".post_index.json")
+CIRCUIT_BREAKER_FILE = os.path.join(SOURCES_DIR, ".circuit_breaker.json")
+COVER_CACHE_DIR = os.path.join(SOURCES_DIR, ".covers")
+COVER_OUTPUT_DIR = os.path.join(OUTPUT_BASE_DIR, "images", "covers")
+COVER_URL_PREFIX = "/images/covers"
+RUN_REPORT_FILE = "run_report.json"
+MANIFEST_FILENAME = ".manifest.json"
+# Bump this whenever the converters change output, so every member's posts get rebuilt
+CONVERTER_VERSION = 7
+DEFAULT_JOBS = 1
+DEFAULT_JOBS_PER_HOST = 2
+DEFAULT_CONVERT_WORKERS = 1
 
 
 def parse_git_url(posts_url):
@@ -113,27 +137,175 @@ def get_member_type_info(member):
     return info
 
 
-def clone_git_repo(repo_url, destination_path):
+def get_mirror_path(repo_url):
+    """
+    Work out where the persistent bare mirror for a repo URL lives,
+    e.g. https://github.com/user/repo.git -> sources/.mirrors/github.com/user/repo.git
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parsed = urlparse(repo_url)
+    repo_path = parsed.path.strip('/')
+    if not repo_path.endswith('.git'):
+        repo_path += '.git'
+    return os.path.join(script_dir, MIRRORS_DIR, parsed.netloc, *repo_path.split('/'))
+
+
+def run_git(git_dir, *args, input=None, remote_url=None):
+    """
+    Run a git command against a bare repository and return its stdout.
+    Commands that talk to the remote pass its remote_url, so they get retried and
+    go through the circuit breaker for its host.
     """
-    Clone a git repository to the specified destination path.
-    Returns True if successful, False otherwise.
+    if remote_url:
+        result = fetcher.run_git(['--git-dir', git_dir, *args], remote_url, input=input)
+    else:
+        result = subprocess.run(['git', '--git-dir', git_dir, *args], input=input, check=True,
+                                capture_output=True, text=True, timeout=fetcher.GIT_TIMEOUT)
+    return result.stdout
+
+
+def update_git_mirror(repo_url, mirror_path):
+    """
+    Create or incrementally update a shallow, blob-filtered bare mirror of a repository.
+    Only the default branch tip and its trees are fetched; file contents are pulled
+    on demand by read_git_posts for just the files we need.
+    """
+    if os.path.exists(os.path.join(mirror_path, 'HEAD')):
+        branch_ref = run_git(mirror_path, 'symbolic-ref', 'HEAD').strip()
+        run_git(mirror_path, 'fetch', '--depth', '1', '--filter=blob:none', '--no-tags',
+                'origin', f'+{branch_ref}:{branch_ref}', remote_url=repo_url)
+        print(f"Updated mirror of {repo_url}")
+    else:
+        if os.path.exists(mirror_path):
+            shutil.rmtree(mirror_path)
+        os.makedirs(os.path.dirname(mirror_path), exist_ok=True)
+        fetcher.run_git(['clone', '--bare', '--depth', '1', '--filter=blob:none',
+                         '--no-tags', repo_url, mirror_path], repo_url)
+        print(f"Created mirror of {repo_url}")
+
+
+def get_remote_head(repo_url):
+    """
+    Look up the commit a remote repository's HEAD points at, without fetching anything.
+    Returns None if the lookup fails.
     """
     try:
-        # Remove destination if it already exists
-        if os.path.exists(destination_path):
-            shutil.rmtree(destination_path)
-
-        # Clone the repository
-        subprocess.run(['git', 'clone', repo_url, destination_path],
-                      check=True, capture_output=True, text=True)
-        print(f"Successfully cloned {repo_url} to {destination_path}")
-        return True
+        with instrumentation.span("ls_remote"):
+            listing = fetcher.run_git(['ls-remote', repo_url, 'HEAD'], repo_url,
+                                      timeout=fetcher.GIT_REF_TIMEOUT).stdout
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, fetcher.HostUnavailable) as e:
+        print(f"Could not look up HEAD of {repo_url}: {e}")
+        return None
+    for line in listing.splitlines():
+        sha, _, ref = line.partition('\t')
+        if ref == 'HEAD':
+            return sha
+    return None
+
+
+def list_markdown_blobs(mirror_path, tree_path):
+    """
+    List the markdown files under tree_path at HEAD as (path, blob_id) pairs,
+    using only the trees so no file contents are needed.
+    """
+    listing = run_git(mirror_path, 'ls-tree', '-r', '-z', 'HEAD', '--', tree_path or '.')
+    markdown_blobs = []
+    for record in listing.split('\0'):
+        if not record:
+            continue
+        meta, path = record.split('\t', 1)
+        _, object_type, object_id = meta.split()
+        if object_type == 'blob' and path.endswith('.md'):
+            markdown_blobs.append((path, object_id))
+    return markdown_blobs
+
+
+def fetch_missing_blobs(mirror_path, tree_path, blob_ids):
+    """
+    Fetch any of blob_ids that the blob-filtered mirror doesn't have yet,
+    in one batched request rather than one lazy fetch per file.
+    Returns the number of blobs fetched.
+    """
+    tree_id = run_git(mirror_path, 'rev-parse', f'HEAD:{tree_path}').strip()
+    reachable = run_git(mirror_path, 'rev-list', '--objects', '--missing=print', tree_id)
+    wanted = set(blob_ids)
+    missing = sorted(
+        line[1:].split()[0] for line in reachable.splitlines()
+        if line.startswith('?') and line[1:].split()[0] in wanted
+    )
+    if missing:
+        remote_url = run_git(mirror_path, 'config', 'remote.origin.url').strip()
+        run_git(mirror_path, '-c', 'fetch.negotiationAlgorithm=noop', 'fetch', 'origin',
+                '--no-tags', '--no-write-fetch-head', '--recurse-submodules=no',
+                '--filter=blob:none', '--stdin', input='\n'.join(missing) + '\n',
+                remote_url=remote_url)
+    return len(missing)
+
+
+def iter_git_blobs(mirror_path, blob_ids):
+    """
+    Yield the contents of each of blob_ids in order, streamed through a single
+    cat-file process rather than one git call per file.
+    """
+    command = ['git', '--git-dir', mirror_path, 'cat-file', '--batch']
+    batch = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for blob_id in blob_ids:
+            batch.stdin.write(f"{blob_id}\n".encode())
+            batch.stdin.flush()
+            header = batch.stdout.readline().decode().split()
+            if len(header) != 3 or header[1] != 'blob':
+                raise RuntimeError(f"Could not read {blob_id} from {mirror_path}")
+            data = batch.stdout.read(int(header[2]))
+            batch.stdout.read(1)  # trailing newline
+            instrumentation.count("bytes_read", len(data))
+            yield data
+    finally:
+        batch.stdin.close()
+        batch.wait()
+
+
+def read_git_posts(mirror_path, tree_path, blob_ids):
+    """
+    Fetch whichever of blob_ids the mirror is missing in one request, then yield
+    their contents in order straight from the object store.
+    """
+    fetched = fetch_missing_blobs(mirror_path, tree_path, blob_ids)
+    instrumentation.count("blobs_fetched", fetched)
+    if fetched:
+        print(f"Fetched {fetched} new markdown files for {tree_path or '/'}")
+    yield from iter_git_blobs(mirror_path, blob_ids)
+
+
+def load_git_posts(repo_url, posts_path=None):
+    """
+    Bring the persistent shallow, blob-filtered bare mirror of a repository up to date and
+    list the markdown files under the posts path (or the whole tree if none is given).
+    Returns (posts, read_posts): posts is a list of (path relative to the posts path, blob id)
+    pairs and read_posts(blob_ids) yields file contents. Nothing is checked out or exported;
+    posts are read from the object store only when they need converting.
+    Returns None if the repository couldn't be fetched.
+    """
+    try:
+        mirror_path = get_mirror_path(repo_url)
+        tree_path = posts_path.strip('/') if posts_path else ''
+        with instrumentation.span("git_fetch"):
+            update_git_mirror(repo_url, mirror_path)
+            markdown_blobs = list_markdown_blobs(mirror_path, tree_path)
     except subprocess.CalledProcessError as e:
+        print(f"Error cloning repository {repo_url}: {e} {e.stderr or ''}".rstrip())
+        return None
+    except (subprocess.TimeoutExpired, fetcher.HostUnavailable) as e:
         print(f"Error cloning repository {repo_url}: {e}")
-        return False
+        return None
     except Exception as e:
         print(f"Unexpected error cloning repository {repo_url}: {e}")
-        return False
+        return None
+
+    prefix = f"{tree_path}/" if tree_path else ''
+    posts = [(path[len(prefix):], blob_id) for path, blob_id in markdown_blobs]
+    print(f"Found {len(posts)} markdown files under {posts_path or '/'} in {repo_url}")
+    return posts, functools.partial(read_git_posts, mirror_path, tree_path)
 
 
 def get_git_clone_url(posts_url):
@@ -155,390 +327,557 @@ def get_git_clone_url(posts_url):
     return None
 
 
-def cleanup_sources_directory(sources_dir, author_name):
+# Every way a post can reference an image, as one alternation so a single scan finds them all
+IMAGE_PATTERN = re.compile(
+    r'!\[[^\]]*\]\((?P<md>[^)]+)\)'                                   # markdown: ![alt](url)
+    r'|(?i:<img[^>]+src=["\'](?P<html>[^"\']+)["\'][^>]*>)'              # HTML: <img ... src="url" ...>
+    r'|(?i:\{\{<\s*figure\s+src=["\'](?P<hugo>[^"\']+)["\'])'           # Hugo: {{< figure src="url" ... >}}
+    r'|\{static\}(?P<static>/[^"\s)>]+)'                                # Pelican: {static}/path
+)
+# Size of the tail window searched first when looking for the last image, doubled until one is found
+IMAGE_SCAN_WINDOW = 4096
+PLACEHOLDER_IMAGE = "/images/placeholder.jpg"
+
+
+def absolutize_image_url(url, domain):
     """
-    Clean up the sources directory after processing a user.
+    Turn an image reference from a post into a URL on the member's site.
     """
-    try:
-        if os.path.exists(sources_dir):
-            shutil.rmtree(sources_dir)
-            print(f"Cleaned up sources directory for {author_name}: {sources_dir}")
-    except Exception as e:
-        print(f"Warning: Could not clean up sources directory {sources_dir}: {e}")
+    # Drop any markdown title after the URL: ![alt](/img.png "title")
+    parts = url.split()
+    url = parts[0] if parts else url
+    if url.startswith('{static}'):
+        url = url[len('{static}'):]
+    if not domain:
+        return url
+    if url.startswith('/') and not url.startswith('//'):
+        # Relative path, make it absolute
+        return f"https://{domain}{url}"
+    if url.startswith('http://') or url.startswith('https://'):
+        # Already absolute
+        return url
+    # Relative path without leading slash, make it absolute
+    return f"https://{domain}/{url}"
 
 
 def extract_last_image_url(content, domain=None):
     """
     Extract the last image URL from post content so we can use it as a cover/thumbnail.
+    Scans backwards from the end of the post in growing windows, so long posts with an
+    image near the end only cost a small search.
     Returns the full URL of the last image found, or placeholder if none found.
     """
-    image_urls = []
+    window = IMAGE_SCAN_WINDOW
+    start = len(content)
+    while start > 0:
+        start = max(0, len(content) - window)
+        last_match = None
+        for last_match in IMAGE_PATTERN.finditer(content, start):
+            pass
+        if last_match:
+            return absolutize_image_url(last_match.group(last_match.lastgroup), domain)
+        window *= 2
 
-    # Pattern for markdown images: ![alt](url)
-    md_pattern = re.compile(r'!\[[^\]]*\]\(([^)]+)\)')
-    md_matches = md_pattern.findall(content)
-    image_urls.extend(md_matches)
+    return PLACEHOLDER_IMAGE
 
-    # There's gotta be a better way to do this...
 
-    # Pattern for HTML img tags: <img ... src="url" ...>
-    html_pattern = re.compile(r'<img[^>]+src=["\']([^"\']+)["\'][^>]*>', re.IGNORECASE)
-    html_matches = html_pattern.findall(content)
-    image_urls.extend(html_matches)
+_cover_cache = None
+_cover_thumbnails = True
 
-    # Pattern for Hugo figure shortcodes: {{< figure src="url" ... >}}
-    hugo_pattern = re.compile(r'\{\{<\s*figure\s+src=["\']([^"\']+)["\']', re.IGNORECASE)
-    hugo_matches = hugo_pattern.findall(content)
-    image_urls.extend(hugo_matches)
 
-    # Pattern for Pelican static paths: {static}/path
-    static_pattern = re.compile(r'\{static\}(/[^"\s)>]+)')
-    static_matches = static_pattern.findall(content)
-    if domain:
-        # Convert static paths to absolute URLs
-        static_urls = [f"https://{domain}{path}" for path in static_matches]
-        image_urls.extend(static_urls)
-    else:
-        image_urls.extend(static_matches)
-
-    # Convert relative URLs to absolute URLs if domain is provided
-    if domain:
-        absolute_urls = []
-        for url in image_urls:
-            if url.startswith('/') and not url.startswith('//'):
-                # Relative path, make it absolute
-                absolute_urls.append(f"https://{domain}{url}")
-            elif url.startswith('http://') or url.startswith('https://'):
-                # Already absolute
-                absolute_urls.append(url)
-            else:
-                # Relative path without leading slash, make it absolute
-                absolute_urls.append(f"https://{domain}/{url}")
-        image_urls = absolute_urls
-
-    # Return the last image URL found, or placeholder if none
-    if image_urls:
-        return image_urls[-1]
-    else:
-        return "/images/placeholder.jpg"
+def configure_cover_thumbnails(enabled):
+    """
+    Turn local cover thumbnails on or off for this process. Also run in each
+    convert pool worker, since spawned workers don't share our globals.
+    """
+    global _cover_cache, _cover_thumbnails
+    _cover_thumbnails = enabled
+    _cover_cache = None
+
+
+def get_cover_cache():
+    """
+    Return this process's cover thumbnail cache, or None if thumbnails are off
+    or Pillow isn't installed.
+    """
+    global _cover_cache
+    if not _cover_thumbnails:
+        return None
+    if _cover_cache is None:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        _cover_cache = CoverCache(os.path.join(script_dir, COVER_CACHE_DIR),
+                                  os.path.join(script_dir, COVER_OUTPUT_DIR),
+                                  COVER_URL_PREFIX,
+                                  os.path.join(script_dir, OUTPUT_BASE_DIR))
+    return _cover_cache if _cover_cache.enabled else None
+
+
+def cover_metadata(cover_url):
+    """
+    Pelican metadata for a post's cover: Cover (and CoverLarge for high-DPI screens)
+    pointing at local thumbnails when they can be made, otherwise the original URL.
+    """
+    cache = get_cover_cache()
+    thumbnails = cache.thumbnails(cover_url) if cache else None
+    if not thumbnails:
+        return {'Cover': cover_url}
+    return {'Cover': thumbnails[0], 'CoverLarge': thumbnails[-1]}
+
+
+def used_cover_urls(content_dir):
+    """
+    Every Cover/CoverLarge URL in the metadata of the posts under content_dir.
+    Only the front matter of each post is read.
+    """
+    urls = set()
+    for root, _, files in os.walk(content_dir):
+        for name in files:
+            if not name.endswith('.md'):
+                continue
+            with open(os.path.join(root, name), 'r', encoding='utf-8', errors='replace') as f:
+                if f.readline().strip() != '---':
+                    continue
+                for line in f:
+                    if line.strip() == '---':
+                        break
+                    key, _, value = line.partition(':')
+                    if key.strip().lower() in ('cover', 'coverlarge'):
+                        urls.add(value.strip())
+    return urls
+
+
+def remove_unused_covers():
+    """
+    Delete cover thumbnails no post uses any more. The workflow commits the site's
+    content, so superseded thumbnails would otherwise pile up in the repo.
+    """
+    cache = get_cover_cache()
+    if cache is None:
+        return 0
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    removed = cache.remove_unused(used_cover_urls(os.path.join(script_dir, OUTPUT_BASE_DIR)))
+    if removed:
+        instrumentation.count("covers_removed", removed)
+        print(f"Removed {removed} unused cover thumbnails")
+    return removed
+
 
+# Site-relative image references the converters rewrite to absolute URLs on the member's site
+IMG_PATTERN_MD = re.compile(r'!\[([^\]]*)\]\((/[^)]+)\)')                 # ![alt](/path)
+IMG_PATTERN_HTML = re.compile(r'<img([^>]*)\s+src="(/[^"]+)"')           # <img ... src="/path"
+STATIC_PATTERN = re.compile(r'\{static\}(/[^"\s)>]+)')                    # Pelican {static}/path
+HUGO_FIGURE_PATTERN = re.compile(r'\{\{<\s*figure\s+src="(/[^"]+)"')     # Hugo {{< figure src="/path"
 
-def copy_markdown_files(source_dir, dest_dir):
+
+def rewrite_image_paths(body, domain):
     """
-    Recursively copy all .md files from source_dir to dest_dir.
-    Returns list of copied files.
+    Convert every site-relative image path in a post body (markdown, HTML <img>,
+    Pelican {static} and Hugo figure shortcodes) to an absolute URL.
     """
-    copied_files = []
+    def replace_img_md(match):
+        return f"![{match.group(1)}](https://{domain}{match.group(2)})"
+
+    def replace_img_html(match):
+        return f"<img{match.group(1)} src=\"https://{domain}{match.group(2)}\""
 
-    if not os.path.exists(source_dir):
-        print(f"Source directory does not exist: {source_dir}")
-        return copied_files
+    def replace_static(match):
+        return f"https://{domain}{match.group(1)}"
 
-    # Create destination directory if it doesn't exist
-    os.makedirs(dest_dir, exist_ok=True)
+    def replace_hugo_figure(match):
+        return f'{{{{< figure src="https://{domain}{match.group(1)}"'
+
+    body = IMG_PATTERN_MD.sub(replace_img_md, body)
+    body = IMG_PATTERN_HTML.sub(replace_img_html, body)
+    body = STATIC_PATTERN.sub(replace_static, body)
+    body = HUGO_FIGURE_PATTERN.sub(replace_hugo_figure, body)
+    return body
+
+
+def write_if_changed(path, data):
+    """
+    Write data (str or bytes) to path unless the file already holds exactly that, going through
+    a temporary file and a rename so a crash can't leave a half-written post behind.
+    Returns True if the file was written.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def get_manifest_settings(member):
+    """
+    Everything besides the source file itself that changes a converted post.
+    If any of it differs from the stored manifest, every post is rebuilt.
+    """
+    return {
+        "converter_version": CONVERTER_VERSION,
+        "author": member.get("author", "Unknown"),
+        "url": member.get("url", ""),
+        "type": member.get("type", ""),
+        "cover_thumbnails": get_cover_cache() is not None,
+    }
 
-    # Walk through source directory and copy .md files
-    for root, dirs, files in os.walk(source_dir):
-        for file in files:
-            if file.endswith('.md'):
-                source_file = os.path.join(root, file)
-                dest_file = os.path.join(dest_dir, file)
 
+def read_manifest(content_dir):
+    """
+    Read a member's manifest file as stored, or an empty one if it's missing or corrupt.
+    """
+    manifest_path = os.path.join(content_dir, MANIFEST_FILENAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def load_manifest(content_dir, member):
+    """
+    Load a member's conversion manifest, mapping each source path (relative to the posts
+    directory) to {"hash": blob hash, "output": converted filename or None if it failed}.
+    Returns an empty manifest if there is none or it was written with different settings.
+    """
+    manifest = read_manifest(content_dir)
+    if not manifest:
+        return {}
+
+    if manifest.get("settings") != get_manifest_settings(member):
+        print(f"Converter settings changed for {member.get('author', 'Unknown')}, rebuilding all posts")
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(content_dir, member, files, source=None):
+    """
+    Write a member's conversion manifest, only touching the file if it changed
+    so a run with no new posts leaves git with nothing to commit. source records
+    the repo, posts path and commit the files were synced from, if known.
+    """
+    manifest_path = os.path.join(content_dir, MANIFEST_FILENAME)
+    manifest = {"settings": get_manifest_settings(member)}
+    if source:
+        manifest["source"] = source
+    manifest["files"] = dict(sorted(files.items()))
+    write_if_changed(manifest_path, json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+
+
+def reuse_synced_posts(content_dir, member, source, owner, priority):
+    """
+    If a member's posts were last synced from exactly this source (e.g. repo, posts path
+    and commit) with the current settings, and every converted post is still there,
+    re-register their keys in the post index for owner and return how many posts there
+    are. Otherwise, or if another source now owns any of the posts, return None and the
+    source needs syncing.
+    """
+    manifest = read_manifest(content_dir)
+    if manifest.get("source") != source or manifest.get("settings") != get_manifest_settings(member):
+        return None
+
+    files = manifest.get("files", {})
+    outputs = {entry["output"] for entry in files.values() if entry.get("output")}
+    if not all(os.path.exists(os.path.join(content_dir, output)) for output in outputs):
+        return None
+
+    index = get_post_index()
+    claimed = [index.claim(entry.get("keys", []), owner, priority) for entry in files.values()]
+    if not all(claimed):
+        # Syncing again drops the posts that are now duplicates
+        return None
+    return len(outputs)
+
+
+_convert_pool = None
+
+
+def start_convert_pool(workers):
+    """
+    Start the process pool that converts posts, shared by every member being processed.
+    With one worker (the default) posts are converted in this process instead.
+    """
+    global _convert_pool
+    if workers > 1:
+        # Spawn rather than fork, since members are processed on worker threads
+        _convert_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=configure_cover_thumbnails, initargs=(_cover_thumbnails,))
+
+
+def stop_convert_pool():
+    global _convert_pool
+    if _convert_pool is not None:
+        _convert_pool.shutdown()
+        _convert_pool = None
+
+
+def convert_post(convert, content, dest_file, author_name, author_url, domain, keep_failed):
+    """
+    Run one post's source through the converter and write the result to dest_file,
+    only touching the file if the output changed. A post that fails to convert is
+    written out unchanged if keep_failed, otherwise not written at all.
+    Returns (result, keys): result is True if it converted, False if it failed, or None if
+    it couldn't be written, and keys are the post's identity keys if it converted.
+    """
+    name = os.path.basename(dest_file)
+    try:
+        new_content = convert(content.decode('utf-8'), name, author_name, author_url, domain)
+    except UnicodeDecodeError as e:
+        print(f"Error reading {name}: {e}")
+        new_content = None
+
+    succeeded = new_content is not None
+    if not succeeded:
+        if not keep_failed:
+            return False, []
+        new_content = content
+
+    try:
+        if write_if_changed(dest_file, new_content):
+            print(f"Wrote {name}")
+    except OSError as e:
+        print(f"Error writing {name}: {e}")
+        return None, []
+    return succeeded, converted_post_keys(new_content) if succeeded else []
+
+
+def converted_post_keys(content):
+    """
+    Identity keys for a converted post, from the Title and Date in its Pelican metadata.
+    """
+    parts = split_front_matter(content)
+    if parts is None:
+        return []
+    return Post.from_metadata(PostMetadata.from_pelican(parts[1])).keys()
+
+
+def convert_posts(convert, contents, dest_files, author_name, author_url, domain, keep_failed):
+    """
+    Convert each post's contents into the matching dest_file, returning convert_post's
+    (result, keys) for each one in the same order. Uses the process pool when it's running, so a member
+    with a big back catalogue converts on every core while the rest is still being read.
+    """
+    # Posts from different folders can share a filename; convert those in order, last one wins
+    if _convert_pool is None or len(dest_files) < 2 or len(set(dest_files)) < len(dest_files):
+        return [convert_post(convert, content, dest_file, author_name, author_url, domain, keep_failed)
+                for content, dest_file in zip(contents, dest_files)]
+
+    futures = [
+        _convert_pool.submit(convert_post, convert, content, dest_file, author_name, author_url, domain, keep_failed)
+        for content, dest_file in zip(contents, dest_files)
+    ]
+    results = []
+    for dest_file, future in zip(dest_files, futures):
+        try:
+            results.append(future.result())
+        except Exception as e:
+            print(f"Error converting {os.path.basename(dest_file)}: {e}")
+            results.append((None, []))
+    return results
+
+
+def sync_markdown_files(posts, read_posts, content_dir, member, convert, remove_failed, source=None):
+    """
+    Bring a member's content directory up to date with their posts.
+    posts is a list of (relative path, git blob id) pairs and read_posts(blob_ids) yields
+    their contents in order. Only posts whose blob id differs from the manifest are read and
+    run through convert(content, name, author_name, author_url, domain), on the convert pool
+    if it's running, and each output is only written if it changed. Posts that disappeared
+    from the source are deleted. Posts that fail to convert are dropped if remove_failed,
+    otherwise written out unchanged; a post that can't be converted or written at all (e.g.
+    its worker crashed) keeps its previously published version and is retried next run. Every post's identity keys are registered in the post
+    index, so feeds carrying the same articles can skip them. source (repo, posts path and
+    commit) is recorded in the manifest once every post is synced, so the next run can skip
+    an unchanged repo without fetching it.
+    Returns (current_posts, converted_posts, removed_posts).
+    """
+    os.makedirs(content_dir, exist_ok=True)
+    author_name = member.get("author", "Unknown")
+    author_url = member.get("url", "")
+    domain = urlparse(author_url).netloc
+    index = get_post_index()
+    owner = f"git:{author_name}"
+
+    previous = load_manifest(content_dir, member)
+    current = {}
+    pending = []
+    converted = 0
+    failed = 0
+
+    for relative_path, blob_id in posts:
+        file = relative_path.rsplit('/', 1)[-1]
+        dest_file = os.path.join(content_dir, file)
+
+        entry = previous.get(relative_path)
+        if entry and entry.get("hash") == blob_id and (
+                entry.get("output") is None or os.path.exists(dest_file)):
+            current[relative_path] = entry
+            index.claim(entry.get("keys", []), owner, PRIORITY_GIT)
+            instrumentation.count("cache_hits")
+            continue
+
+        pending.append((relative_path, file, dest_file, blob_id))
+
+    # Read and convert the new and changed posts. Results come back in the same order as pending.
+    contents = read_posts([blob_id for _, _, _, blob_id in pending]) if pending else []
+    results = convert_posts(convert, contents, [dest_file for _, _, dest_file, _ in pending],
+                            author_name, author_url, domain, keep_failed=not remove_failed)
+    for (relative_path, file, dest_file, blob_id), (succeeded, keys) in zip(pending, results):
+        if succeeded is None:
+            # Not converted at all: keep whatever was published before (and its manifest entry,
+            # whose old hash makes the next run retry it) rather than treating it as deleted
+            instrumentation.count("conversion_failures")
+            failed += 1
+            if relative_path in previous:
+                current[relative_path] = previous[relative_path]
+                index.claim(previous[relative_path].get("keys", []), owner, PRIORITY_GIT)
+            continue
+
+        output = file
+        if not succeeded and remove_failed:
+            output = None
+            instrumentation.count("conversion_failures")
+            # Drop any earlier version of the post that did convert
+            if os.path.exists(dest_file):
                 try:
-                    shutil.copy2(source_file, dest_file)
-                    copied_files.append(dest_file)
-                    print(f"Copied: {file}")
+                    os.remove(dest_file)
+                    print(f"Removed {file} - could not process")
                 except Exception as e:
-                    print(f"Error copying {file}: {e}")
+                    print(f"Error removing {dest_file}: {e}")
+        converted += 1
+        instrumentation.count("files_converted")
+        current[relative_path] = {"hash": blob_id, "output": output, "keys": keys}
+        index.claim(keys, owner, PRIORITY_GIT)
+
+    # Delete posts that are no longer in the member's repo
+    live_outputs = {entry["output"] for entry in current.values() if entry.get("output")}
+    removed = 0
+    live_keys = {key for entry in current.values() for key in entry.get("keys", [])}
+    for relative_path, entry in previous.items():
+        index.release([key for key in entry.get("keys", []) if key not in live_keys], owner)
+        output = entry.get("output")
+        if relative_path in current or not output or output in live_outputs:
+            continue
+        stale_file = os.path.join(content_dir, output)
+        if os.path.exists(stale_file):
+            os.remove(stale_file)
+            removed += 1
+            instrumentation.count("files_removed")
+            print(f"Removed {output} - no longer in source")
+
+    # Posts that failed are retried next run, so don't mark this commit as done
+    save_manifest(content_dir, member, current, source if not failed else None)
+    return len(live_outputs), converted, removed
 
-    return copied_files
 
+# The order the Hugo and RSS converters have always written their Pelican metadata in, kept
+# so converted posts don't all change on disk. Pelican posts keep their own fields' order.
+HUGO_METADATA_ORDER = ('Title', 'Date', 'Modified', 'Summary', 'Tags', 'Author', 'AuthorURL', 'Category',
+                       'Status', 'Cover', 'CoverLarge')
+RSS_METADATA_ORDER = ('Title', 'Author', 'AuthorURL', 'Date', 'Category', 'Source', 'Status', 'Original-URL',
+                      'Cover', 'CoverLarge', 'Summary')
 
-def process_pelican_metadata(file_path, author_name, author_url, domain):
+
+def convert_pelican_post(content, file_name, author_name, author_url, domain):
     """
-    Process a Pelican markdown file to ensure proper metadata format.
+    Convert a Pelican markdown post to ensure proper metadata format.
     Updates Author and AuthorURL fields, and converts image paths to absolute URLs.
+    Returns the converted post, or None if it couldn't be converted.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
         # Split content into metadata and body
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                metadata_section = parts[1].strip()
-                body_section = parts[2].strip()
-            else:
-                print(f"Warning: Could not parse metadata in {file_path}")
-                return
-        else:
-            print(f"Warning: No metadata found in {file_path}")
-            return
-
-        # Parse existing metadata
-        metadata_lines = metadata_section.split('\n')
-        metadata_dict = {}
-
-        for line in metadata_lines:
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata_dict[key.strip()] = value.strip()
-
-        # Collect existing categories and tags
-        existing_categories = []
-        existing_tags = []
-
-        # Parse existing categories
-        if 'Category' in metadata_dict:
-            cat_value = metadata_dict['Category']
-            if cat_value:
-                existing_categories = [c.strip() for c in cat_value.split(',') if c.strip()]
-
-        # Parse existing tags
-        if 'Tags' in metadata_dict:
-            tag_value = metadata_dict['Tags']
-            if tag_value:
-                existing_tags = [t.strip() for t in tag_value.split(',') if t.strip()]
-
-        # Move original categories to tags
-        all_tags = existing_tags + existing_categories
-
-        # Update/add our required fields
-        metadata_dict['Author'] = author_name
-        metadata_dict['AuthorURL'] = author_url
-        metadata_dict['Category'] = author_name  # Use author name as category
-
-        # Set combined tags (original tags + original categories)
-        if all_tags:
-            metadata_dict['Tags'] = ', '.join(all_tags)
+        if not content.startswith('---'):
+            print(f"Warning: No metadata found in {file_name}")
+            return None
+        parts = split_front_matter(content)
+        if parts is None:
+            print(f"Warning: Could not parse metadata in {file_name}")
+            return None
+        _, metadata_section, body_section = parts
+
+        metadata = PostMetadata.from_pelican(metadata_section)
+
+        # Our author fields, with the original categories moved to tags
+        post = Post.from_metadata(metadata, author=author_name, author_url=author_url,
+                                  tags=metadata.tags + metadata.categories)
 
         # Extract cover image from post content
-        cover_image_url = extract_last_image_url(body_section, domain)
-        metadata_dict['Cover'] = cover_image_url
+        post.extra.update(cover_metadata(extract_last_image_url(body_section, domain)))
 
         # Convert relative image paths to absolute URLs
-        # Look for ![alt](path), <img src="path">, and {static}/path patterns
-        img_pattern_md = re.compile(r'!\[([^\]]*)\]\((/[^)]+)\)')
-        img_pattern_html = re.compile(r'<img([^>]*)\s+src="(/[^"]+)"')
-        static_pattern = re.compile(r'\{static\}(/[^"\s)>]+)')
-
-        def replace_img_md(match):
-            alt_text = match.group(1)
-            img_path = match.group(2)
-            if img_path.startswith('/'):
-                absolute_url = f"https://{domain}{img_path}"
-                return f"![{alt_text}]({absolute_url})"
-            return match.group(0)
-
-        def replace_img_html(match):
-            other_attrs = match.group(1)
-            img_path = match.group(2)
-            if img_path.startswith('/'):
-                absolute_url = f"https://{domain}{img_path}"
-                return f"<img{other_attrs} src=\"{absolute_url}\""
-            return match.group(0)
-
-        def replace_static(match):
-            img_path = match.group(1)
-            absolute_url = f"https://{domain}{img_path}"
-            return absolute_url
-        body_section = img_pattern_md.sub(replace_img_md, body_section)
-        body_section = img_pattern_html.sub(replace_img_html, body_section)
-        body_section = static_pattern.sub(replace_static, body_section)
-
-        # Rebuild the file content
-        new_metadata = []
-        for key, value in metadata_dict.items():
-            new_metadata.append(f"{key}: {value}")
-
-        new_content = f"---\n{chr(10).join(new_metadata)}\n---\n\n{body_section}"
-
-        # Write back to file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-
-        print(f"Updated metadata in {os.path.basename(file_path)}")
+        body_section = rewrite_image_paths(body_section, domain)
+
+        return post.to_pelican(body_section, order=metadata.fields)
 
     except Exception as e:
-        print(f"Error processing metadata in {file_path}: {e}")
+        print(f"Error processing metadata in {file_name}: {e}")
+        return None
 
 
-def process_hugo_metadata(file_path, author_name, author_url, domain):
+def convert_hugo_post(content, file_name, author_name, author_url, domain):
     """
-    Process a Hugo markdown file and convert it to Pelican format.
-    Converts Hugo frontmatter (--- or +++) to Pelican metadata format.
+    Convert a Hugo markdown post to Pelican format.
+    Converts Hugo frontmatter (YAML between --- or TOML between +++) to Pelican metadata format.
     Updates Author and AuthorURL fields, and converts image paths to absolute URLs.
+    Returns the converted post, or None if it couldn't be converted.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Determine frontmatter delimiter (--- or +++)
-        frontmatter_delim = None
-        if content.startswith('---'):
-            frontmatter_delim = '---'
-        elif content.startswith('+++'):
-            frontmatter_delim = '+++'
-        else:
-            print(f"Warning: No Hugo frontmatter found in {file_path}")
-            return False
+        if not content.startswith(('---', '+++')):
+            print(f"Warning: No Hugo frontmatter found in {file_name}")
+            return None
 
         # Split content into frontmatter and body
-        parts = content.split(frontmatter_delim, 2)
-        if len(parts) < 3:
-            print(f"Warning: Could not parse Hugo frontmatter in {file_path}")
-            return False
-
-        frontmatter_section = parts[1].strip()
-        body_section = parts[2].strip()
-
-        # Parse Hugo frontmatter
-        hugo_metadata = {}
-
-        if frontmatter_delim == '+++':
-            # TOML format - simple key = value parsing
-            for line in frontmatter_section.split('\n'):
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip().strip('"').strip("'")
-                    hugo_metadata[key] = value
-        else:
-            # YAML format - key: value parsing
-            for line in frontmatter_section.split('\n'):
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip().strip('"').strip("'")
-                    hugo_metadata[key] = value
+        parts = split_front_matter(content)
+        if parts is None:
+            print(f"Warning: Could not parse Hugo frontmatter in {file_name}")
+            return None
+        frontmatter_delim, frontmatter_section, body_section = parts
 
-        # Convert Hugo metadata to Pelican format
-        pelican_metadata = {}
+        hugo_metadata = PostMetadata.from_hugo(frontmatter_delim, frontmatter_section)
 
         # Required fields - must have title and date
-        title = hugo_metadata.get('title', '').strip()
-        date = hugo_metadata.get('date', '').strip()
+        title = hugo_metadata.title
+        date = hugo_metadata.date
 
         if not title:
-            print(f"Warning: No title found in {file_path}, skipping")
-            return False
+            print(f"Warning: No title found in {file_name}, skipping")
+            return None
         if not date:
-            print(f"Warning: No date found in {file_path}, skipping")
-            return False
-
-        pelican_metadata['Title'] = title
-        pelican_metadata['Date'] = date
-
-        # Optional fields
-        if hugo_metadata.get('summary'):
-            pelican_metadata['Summary'] = hugo_metadata['summary']
-        elif hugo_metadata.get('description'):
-            pelican_metadata['Summary'] = hugo_metadata['description']
-
-        # Handle categories - Hugo might use 'categories' or 'category'
-        # We'll add these to tags instead of using them as categories
-        categories = []
-        if hugo_metadata.get('categories'):
-            # Could be a list or comma-separated string
-            cat_value = hugo_metadata['categories']
-            if '[' in cat_value and ']' in cat_value:
-                # Parse array format like ["cat1", "cat2"]
-                categories = [c.strip().strip('"').strip("'") for c in cat_value.strip('[]').split(',') if c.strip().strip('"').strip("'")]
-            elif ',' in cat_value:
-                # Comma-separated values
-                categories = [c.strip().strip('"').strip("'") for c in cat_value.split(',') if c.strip().strip('"').strip("'")]
-            else:
-                categories = [cat_value.strip().strip('"').strip("'")] if cat_value.strip() else []
-        elif hugo_metadata.get('category'):
-            cat_val = hugo_metadata['category'].strip().strip('"').strip("'")
-            if cat_val:
-                categories = [cat_val]
-
-        # Handle tags
-        tags = []
-        if hugo_metadata.get('tags'):
-            tag_value = hugo_metadata['tags']
-            if '[' in tag_value and ']' in tag_value:
-                # Parse array format like ["tag1", "tag2"]
-                tags = [t.strip().strip('"').strip("'") for t in tag_value.strip('[]').split(',') if t.strip().strip('"').strip("'")]
-            elif ',' in tag_value:
-                # Comma-separated values
-                tags = [t.strip().strip('"').strip("'") for t in tag_value.split(',') if t.strip().strip('"').strip("'")]
-            else:
-                tag_val = tag_value.strip().strip('"').strip("'")
-                if tag_val:
-                    tags = [tag_val]
-
-        # Combine original tags and original categories into tags
-        all_tags = tags + categories
-        if all_tags:
-            pelican_metadata['Tags'] = ', '.join(all_tags)
-
-        # Add our required fields
-        pelican_metadata['Author'] = author_name
-        pelican_metadata['AuthorURL'] = author_url
-        pelican_metadata['Category'] = author_name  # Use author name as category
-        pelican_metadata['Status'] = 'published'
+            print(f"Warning: No date found in {file_name}, skipping")
+            return None
 
         # Extract cover image from post content
         cover_image_url = extract_last_image_url(body_section, domain)
-        pelican_metadata['Cover'] = cover_image_url
+
+        # Convert Hugo metadata to a Pelican post, combining original tags and categories into tags
+        post = Post(
+            title=title,
+            date=date,
+            modified=hugo_metadata.modified,
+            summary=hugo_metadata.summary,
+            tags=hugo_metadata.tags + hugo_metadata.categories,
+            author=author_name,
+            author_url=author_url,
+            status='draft' if hugo_metadata.draft else 'published',
+            extra=cover_metadata(cover_image_url),
+        )
 
         # Convert relative image paths to absolute URLs
-        # Look for ![alt](path), <img src="path">, and Hugo shortcodes
-        img_pattern_md = re.compile(r'!\[([^\]]*)\]\((/[^)]+)\)')
-        img_pattern_html = re.compile(r'<img([^>]*)\s+src="(/[^"]+)"')
-        hugo_static_pattern = re.compile(r'\{\{<\s*figure\s+src="(/[^"]+)"')
-
-        def replace_img_md(match):
-            alt_text = match.group(1)
-            img_path = match.group(2)
-            if img_path.startswith('/'):
-                absolute_url = f"https://{domain}{img_path}"
-                return f"![{alt_text}]({absolute_url})"
-            return match.group(0)
-
-        def replace_img_html(match):
-            other_attrs = match.group(1)
-            img_path = match.group(2)
-            if img_path.startswith('/'):
-                absolute_url = f"https://{domain}{img_path}"
-                return f"<img{other_attrs} src=\"{absolute_url}\""
-            return match.group(0)
-
-        def replace_hugo_figure(match):
-            img_path = match.group(1)
-            absolute_url = f"https://{domain}{img_path}"
-            return f'{{{{< figure src="{absolute_url}"'
-
-        body_section = img_pattern_md.sub(replace_img_md, body_section)
-        body_section = img_pattern_html.sub(replace_img_html, body_section)
-        body_section = hugo_static_pattern.sub(replace_hugo_figure, body_section)
-
-        # Rebuild the file content in Pelican format
-        new_metadata = []
-        for key, value in pelican_metadata.items():
-            new_metadata.append(f"{key}: {value}")
-
-        new_content = f"---\n{chr(10).join(new_metadata)}\n---\n\n{body_section}"
-
-        # Write back to file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-
-        print(f"Converted Hugo metadata to Pelican format in {os.path.basename(file_path)}")
-        return True
+        body_section = rewrite_image_paths(body_section, domain)
+
+        return post.to_pelican(body_section, order=HUGO_METADATA_ORDER)
 
     except Exception as e:
-        print(f"Error processing Hugo metadata in {file_path}: {e}")
-        return False
+        print(f"Error processing Hugo metadata in {file_name}: {e}")
+        return None
 
 
 def get_hugo(member, force_refresh=False):
@@ -571,47 +910,36 @@ def get_hugo(member, force_refresh=False):
         return False
 
     # Set up paths
-    sources_dir = os.path.join(script_dir, SOURCES_DIR, domain)
     content_dir = os.path.join(script_dir, OUTPUT_BASE_DIR, domain)
 
-    # Check if already processed (skip if content directory already exists)
-    if os.path.exists(content_dir):
-        if not force_refresh:
-            print(f"Content directory already exists for {member['author']}, skipping...")
-            return True
-        shutil.rmtree(content_dir)
-
-    # Clone the repository
-    if not clone_git_repo(clone_url, sources_dir):
-        return False
+    # Check if already processed (skip if content directory already exists).
+    # With --force the posts are re-synced, but only changed files get converted again.
+    if os.path.exists(content_dir) and not force_refresh:
+        print(f"Content directory already exists for {member['author']}, skipping...")
+        return True
 
-    # Copy markdown files from the posts path to our content directory
-    source_posts_dir = os.path.join(sources_dir, posts_path.lstrip('/') if posts_path else '')
-    copied_files = copy_markdown_files(source_posts_dir, content_dir)
+    # Skip fetching and converting entirely if the repo hasn't moved since the last sync
+    source = {"repo": clone_url, "posts_path": posts_path, "commit": get_remote_head(clone_url)}
+    post_count = None
+    if source["commit"]:
+        post_count = reuse_synced_posts(content_dir, member, source, f"git:{member['author']}", PRIORITY_GIT)
+    if post_count is not None:
+        instrumentation.count("repos_unchanged")
+        print(f"Repo unchanged at {source['commit'][:12]}, keeping {post_count} Hugo posts for {member['author']}")
+        return True
 
-    if not copied_files:
-        print(f"No markdown files found to copy for {member['author']}")
-        # Clean up the sources directory even if no files were found
-        cleanup_sources_directory(sources_dir, member['author'])
+    # Update the mirror and list the posts under the posts path
+    git_posts = load_git_posts(clone_url, posts_path)
+    if git_posts is None:
         return False
 
-    # Process each copied file to convert Hugo metadata to Pelican format
-    author_name = member.get("author", "Unknown")
-    author_url = member.get("url", "")
-    successful_conversions = 0
-
-    for file_path in copied_files:
-        if process_hugo_metadata(file_path, author_name, author_url, domain):
-            successful_conversions += 1
-        else:
-            # Remove files that couldn't be processed (missing title/date)
-            try:
-                os.remove(file_path)
-                print(f"Removed {os.path.basename(file_path)} - could not process")
-            except Exception as e:
-                print(f"Error removing {file_path}: {e}")
+    # Convert new and changed posts straight from the mirror into our content directory
+    posts, read_posts = git_posts
+    with instrumentation.span("convert"):
+        post_count, converted, removed = sync_markdown_files(
+            posts, read_posts, content_dir, member, convert_hugo_post, remove_failed=True, source=source)
 
-    if successful_conversions == 0:
+    if post_count == 0:
         print(f"No Hugo posts could be successfully converted for {member['author']}")
         # Clean up empty content directory
         try:
@@ -619,50 +947,12 @@ def get_hugo(member, force_refresh=False):
                 shutil.rmtree(content_dir)
         except Exception as e:
             print(f"Warning: Could not clean up empty content directory {content_dir}: {e}")
-
-        cleanup_sources_directory(sources_dir, member['author'])
         return False
 
-    print(f"Successfully converted {successful_conversions}/{len(copied_files)} Hugo posts for {member['author']}")
-
-    # Clean up the sources directory after successful processing
-    cleanup_sources_directory(sources_dir, member['author'])
-
+    print(f"{post_count} Hugo posts for {member['author']} ({converted} converted, {removed} removed)")
     return True
 
 
-def parse_rss_date(date_str):
-    """
-    Parse various RSS date formats and return a standardized format for Pelican.
-    Common formats: RFC822, RFC3339, ISO8601
-    """
-    if not date_str:
-        return datetime.now().strftime('%Y-%m-%d %H:%M')
-
-    # Common RSS date formats to try
-    formats = [
-        '%a, %d %b %Y %H:%M:%S %z',      # RFC822: "Wed, 02 Oct 2024 14:30:00 +0000"
-        '%a, %d %b %Y %H:%M:%S %Z',      # RFC822 with timezone name
-        '%a, %d %b %Y %H:%M:%S',         # RFC822 without timezone
-        '%Y-%m-%dT%H:%M:%S%z',           # ISO8601 with timezone
-        '%Y-%m-%dT%H:%M:%SZ',            # ISO8601 UTC
-        '%Y-%m-%dT%H:%M:%S',             # ISO8601 without timezone
-        '%Y-%m-%d %H:%M:%S',             # Simple format
-        '%d %b %Y %H:%M:%S',             # Alternative format
-    ]
-
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(date_str.strip(), fmt)
-            return dt.strftime('%Y-%m-%d %H:%M')
-        except ValueError:
-            continue
-
-    # If all parsing fails, use current time
-    print(f"Warning: Could not parse date '{date_str}', using current time")
-    return datetime.now().strftime('%Y-%m-%d %H:%M')
-
-
 def sanitize_filename(title):
     """
     Convert a post title into a safe filename for markdown files.
@@ -686,206 +976,134 @@ def sanitize_filename(title):
     return title.lower()
 
 
-def fetch_and_parse_rss(rss_url):
+_feed_reader = None
+_feed_reader_lock = threading.Lock()
+
+
+def get_feed_reader():
     """
-    Fetch and parse an RSS feed, returning a list of entries.
+    Return the shared feed reader, so each feed is fetched and parsed once per run
+    however many members and outputs use it.
     """
-    try:
-        print(f"Fetching RSS feed from: {rss_url}")
-
-        # Add headers to avoid being blocked
-        req = urllib.request.Request(
-            rss_url,
-            headers={
-                'User-Agent': 'AmateurEngineering.com RSS Aggregator 1.0',
-                'Accept': 'application/rss+xml, application/xml, text/xml'
-            }
-        )
+    global _feed_reader
+    with _feed_reader_lock:
+        if _feed_reader is None:
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            _feed_reader = FeedReader(os.path.join(script_dir, FEED_CACHE_DIR))
+        return _feed_reader
 
-        with urllib.request.urlopen(req) as response:
-            rss_content = response.read().decode('utf-8')
 
-        # Parse the XML
-        root = ET.fromstring(rss_content)
+_post_index = None
+_post_index_lock = threading.Lock()
 
-        # Handle both RSS and Atom feeds
-        entries = []
 
-        # Try RSS format first
-        items = root.findall('.//item')
-        if not items:
-            # Try Atom format
-            items = root.findall('.//{http://www.w3.org/2005/Atom}entry')
-            is_atom = True
-        else:
-            is_atom = False
-
-        for item in items:
-            entry = {}
-
-            if is_atom:
-                # Atom format
-                title_elem = item.find('.//{http://www.w3.org/2005/Atom}title')
-                entry['title'] = title_elem.text if title_elem is not None else 'Untitled'
-
-                link_elem = item.find('.//{http://www.w3.org/2005/Atom}link')
-                entry['link'] = link_elem.get('href', '') if link_elem is not None else ''
-
-                content_elem = item.find('.//{http://www.w3.org/2005/Atom}content')
-                if content_elem is None:
-                    content_elem = item.find('.//{http://www.w3.org/2005/Atom}summary')
-                entry['content'] = content_elem.text if content_elem is not None else ''
-
-                date_elem = item.find('.//{http://www.w3.org/2005/Atom}published')
-                if date_elem is None:
-                    date_elem = item.find('.//{http://www.w3.org/2005/Atom}updated')
-                entry['date'] = date_elem.text if date_elem is not None else ''
-
-            else:
-                # RSS format
-                title_elem = item.find('title')
-                if title_elem is not None and title_elem.text:
-                    entry['title'] = title_elem.text
-                else:
-                    # No title found, try to generate one from GUID or description
-                    guid_elem = item.find('guid')
-                    if guid_elem is not None and guid_elem.text:
-                        # Extract a title from the GUID URL if possible
-                        guid_text = guid_elem.text
-                        if '/' in guid_text:
-                            # Try to get the last part of the URL as an ID
-                            entry['title'] = f"Post {guid_text.split('/')[-1]}"
-                        else:
-                            entry['title'] = f"Post {guid_text}"
-                    else:
-                        # Try to create title from description
-                        desc_elem = item.find('description')
-                        if desc_elem is not None and desc_elem.text:
-                            # Get first 50 chars of description, strip HTML
-                            import re
-                            desc_text = re.sub(r'<[^>]+>', '', desc_elem.text)
-                            desc_text = desc_text.strip()[:50]
-                            if desc_text:
-                                entry['title'] = desc_text + ('...' if len(desc_text) == 50 else '')
-                            else:
-                                entry['title'] = 'Untitled Post'
-                        else:
-                            entry['title'] = 'Untitled Post'
-
-                link_elem = item.find('link')
-                entry['link'] = link_elem.text if link_elem is not None else ''
-
-                # Try description first, then content:encoded
-                content_elem = item.find('description')
-                if content_elem is None:
-                    content_elem = item.find('.//{http://purl.org/rss/1.0/modules/content/}encoded')
-                entry['content'] = content_elem.text if content_elem is not None else ''
-
-                date_elem = item.find('pubDate')
-                if date_elem is None:
-                    date_elem = item.find('.//{http://purl.org/dc/elements/1.1/}date')
-                entry['date'] = date_elem.text if date_elem is not None else ''
-
-            # Clean up HTML entities and content
-            entry['title'] = html.unescape(entry['title']).strip() if entry['title'] else ''
-            entry['content'] = html.unescape(entry['content']).strip() if entry['content'] else ''
-
-            # Skip entries without title (but now we should always have some kind of title)
-            if entry['title'] and entry['title'].strip():
-                entries.append(entry)
-
-        print(f"Successfully parsed {len(entries)} entries from RSS feed")
-        return entries
+def get_post_index():
+    """
+    Return the shared index of post identities, loading it on first use.
+    """
+    global _post_index
+    with _post_index_lock:
+        if _post_index is None:
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            _post_index = PostIndex(os.path.join(script_dir, POST_INDEX_FILE))
+        return _post_index
 
-    except Exception as e:
-        print(f"Error fetching or parsing RSS feed {rss_url}: {e}")
-        return []
+
+def rss_entry_key(entry):
+    """
+    Identify a feed entry across runs: its GUID/Atom id, else its link, else title and date.
+    """
+    return entry.guid or entry.url or f"{entry.title}|{entry.day or ''}"
 
 
-def create_rss_markdown_file(entry, output_dir, author_name, author_url):
+class SlugIndex:
     """
-    Create a Pelican markdown file from an RSS entry.
+    Hands out unique markdown filenames for feed entries in one content directory.
+    Entries already in the manifest keep their filename, so output paths stay the same
+    from run to run; new entries get the first free "-N" suffix without touching the disk.
     """
-    try:
-        # Generate filename from title
-        filename = sanitize_filename(entry['title']) + '.md'
-        filepath = os.path.join(output_dir, filename)
 
-        # Avoid duplicate files by adding a number suffix if needed
-        counter = 1
-        base_filepath = filepath
-        while os.path.exists(filepath):
-            name, ext = os.path.splitext(base_filepath)
-            filepath = f"{name}-{counter}{ext}"
+    def __init__(self, assignments=None):
+        self.assignments = dict(assignments or {})
+        self.taken = set(self.assignments.values())
+        self._next_suffix = {}
+
+    def allocate(self, key, title):
+        """Return the filename for an entry, allocating a new one if it hasn't got one yet."""
+        filename = self.assignments.get(key)
+        if filename:
+            return filename
+
+        base = sanitize_filename(title)
+        counter = self._next_suffix.get(base, 0)
+        filename = f"{base}.md" if counter == 0 else f"{base}-{counter}.md"
+        while filename in self.taken:
             counter += 1
+            filename = f"{base}-{counter}.md"
+        self._next_suffix[base] = counter + 1
+        self.taken.add(filename)
+        self.assignments[key] = filename
+        return filename
 
-        # Parse and format the date
-        pelican_date = parse_rss_date(entry['date'])
 
-        # Create the content
-        content_lines = [
-            "---",
-            f"Title: {entry['title']}",
-            f"Author: {author_name}",
-            f"AuthorURL: {author_url}",
-            f"Date: {pelican_date}",
-            f"Category: {author_name}",
-            "Source: RSS",
-            "Status: published"
-        ]
-
-        # Add original URL if available
-        if entry['link']:
-            content_lines.append(f"Original-URL: {entry['link']}")
-
-        # Extract cover image from entry content (no domain since RSS content may have absolute URLs)
-        cover_image_url = extract_last_image_url(entry['content'] or '', None)
-        content_lines.append(f"Cover: {cover_image_url}")
-
-        # Create summary from content (first 200 chars)
-        if entry['content']:
-            # Strip HTML tags for summary
-            summary_text = re.sub(r'<[^>]+>', '', entry['content'])
-            summary_text = ' '.join(summary_text.split())  # Clean whitespace
-            if len(summary_text) > 200:
-                summary_text = summary_text[:200] + "..."
-            content_lines.append(f"Summary: {summary_text}")
-
-        content_lines.extend([
-            "---",
+def render_rss_entry(entry, author_name, author_url):
+    """
+    Render an RSS entry as a Pelican markdown post.
+    """
+    date = entry.date
+    if date is None:
+        print(f"Warning: No usable date for '{entry.title}', using current time")
+        date = datetime.now(timezone.utc)
+
+    # The feed's entry is shared with the aggregator, so fill in a copy of it.
+    # Cover image from the entry content (no domain since RSS content may have absolute URLs),
+    # summary from the first 200 chars of it
+    post = entry.replace(
+        date=date,
+        author=author_name,
+        author_url=author_url,
+        source='RSS',
+        status='published',
+        summary=summarize(entry.content, 200) if entry.content else '',
+        extra=cover_metadata(extract_last_image_url(entry.content or '', None)),
+    )
+
+    # The main content, with a link to the original post
+    body_lines = ["# " + entry.title, "", entry.content or "*Content not available in RSS feed.*"]
+    if entry.url:
+        body_lines.extend([
             "",
-            "# " + entry['title'],
-            ""
+            "---",
+            f"**[Read the full post on the original site]({entry.url})**"
         ])
 
-        # Add the main content
-        if entry['content']:
-            content_lines.append(entry['content'])
-        else:
-            content_lines.append("*Content not available in RSS feed.*")
-
-        # Add link to original post
-        if entry['link']:
-            content_lines.extend([
-                "",
-                "---",
-                f"**[Read the full post on the original site]({entry['link']})**"
-            ])
+    return post.to_pelican('\n'.join(body_lines), order=RSS_METADATA_ORDER)
 
-        # Write the file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(content_lines))
 
+def create_rss_markdown_file(entry, output_dir, author_name, author_url, slugs=None):
+    """
+    Create a Pelican markdown file from an RSS entry, named by the slug index
+    (a fresh one for just this directory if none is given). The file is only
+    rewritten if its content changed.
+    """
+    try:
+        if slugs is None:
+            slugs = SlugIndex()
+            slugs.taken.update(os.listdir(output_dir))
+        filename = slugs.allocate(rss_entry_key(entry), entry.title)
+        filepath = os.path.join(output_dir, filename)
+        write_if_changed(filepath, render_rss_entry(entry, author_name, author_url))
         return filepath
 
     except Exception as e:
-        print(f"Error creating markdown file for RSS entry '{entry.get('title', 'unknown')}': {e}")
+        print(f"Error creating markdown file for RSS entry '{entry.title or 'unknown'}': {e}")
         return None
 
 
-def get_rss(member, force_refresh=False):
+def get_rss(member, force_refresh=False, max_entries=None):
     """
     Process an RSS feed member by fetching entries and creating Pelican markdown files.
+    Only the first max_entries items of the feed are used if given.
     """
     print(f"\nProcessing RSS feed for {member['author']}")
 
@@ -902,13 +1120,9 @@ def get_rss(member, force_refresh=False):
     content_dir = os.path.join(script_dir, OUTPUT_BASE_DIR, domain)
 
     # Check if already processed (skip if content directory already exists)
-    if os.path.exists(content_dir):
-        if not force_refresh:
-            print(f"Content directory already exists for {member['author']}, skipping...")
-            return True
-        # On force refresh, start clean so re-created entries don't get
-        # "-1", "-2" duplicate-filename suffixes from the existing files
-        shutil.rmtree(content_dir)
+    if os.path.exists(content_dir) and not force_refresh:
+        print(f"Content directory already exists for {member['author']}, skipping...")
+        return True
 
     # Get the RSS feed URL (check both 'posts' and 'rss' fields)
     rss_url = member.get("posts", "") or member.get("rss", "")
@@ -916,8 +1130,25 @@ def get_rss(member, force_refresh=False):
         print(f"Error: No RSS URL provided for {member['author']}")
         return False
 
-    # Fetch and parse RSS feed
-    entries = fetch_and_parse_rss(rss_url)
+    # Fetch and parse RSS feed, once per run however many outputs use it
+    print(f"Fetching RSS feed from: {rss_url}")
+    feed = get_feed_reader().read(rss_url, max_entries)
+    if feed.error:
+        print(f"Error fetching or parsing RSS feed {rss_url}: {feed.error}")
+        return False
+    entries = feed.entries
+    print(f"Read {len(entries)} entries from RSS feed{' (not modified)' if feed.not_modified else ''}")
+
+    # Leave the posts alone if they were written from this same version of the feed
+    author_name = member.get("author", "Unknown")
+    author_url = member.get("url", "")
+    owner = f"rss:{author_name}"
+    source = {"feed": rss_url, "version": feed.version, "max_entries": max_entries}
+    if feed.version and reuse_synced_posts(content_dir, member, source, owner, PRIORITY_FEED) is not None:
+        instrumentation.count("feeds_unchanged")
+        print(f"RSS feed unchanged for {member['author']}, keeping existing posts")
+        return True
+
     if not entries:
         print(f"No entries found in RSS feed for {member['author']}")
         return False
@@ -925,16 +1156,48 @@ def get_rss(member, force_refresh=False):
     # Create content directory
     os.makedirs(content_dir, exist_ok=True)
 
-    # Process each RSS entry
-    author_name = member.get("author", "Unknown")
-    author_url = member.get("url", "")
+    # Entries we've seen before keep their filenames; one listing tells us what's on disk
+    existing_files = {name for name in os.listdir(content_dir) if name.endswith('.md')}
+    previous = load_manifest(content_dir, member)
+    slugs = SlugIndex({key: entry["output"] for key, entry in previous.items() if entry.get("output")})
+    index = get_post_index()
+    current = {}
+    seen = SeenPosts()
     successful_conversions = 0
 
-    for entry in entries:
-        filepath = create_rss_markdown_file(entry, content_dir, author_name, author_url)
-        if filepath:
-            successful_conversions += 1
-            print(f"Created: {os.path.basename(filepath)}")
+    # Process each RSS entry, dropping any we already have from this feed or another source
+    with instrumentation.span("write"):
+        for entry in entries:
+            key = rss_entry_key(entry)
+            # Keyed on the day as the feed has it, like the Date of the same post in a member's repo
+            keys = entry.keys()
+            if key in current or not seen.add(keys):
+                instrumentation.count("duplicates_skipped")
+                continue
+            duplicate_of = index.conflicting_owner(keys, owner)
+            if duplicate_of or not index.claim(keys, owner):
+                # Claimed by another feed since the lookup
+                duplicate_of = duplicate_of or index.conflicting_owner(keys, owner)
+                print(f"Skipped duplicate: {entry.title} (already from {duplicate_of})")
+                instrumentation.count("duplicates_skipped")
+                continue
+
+            filepath = create_rss_markdown_file(entry, content_dir, author_name, author_url, slugs)
+            if filepath:
+                successful_conversions += 1
+                instrumentation.count("files_converted")
+                current[key] = {"output": os.path.basename(filepath), "keys": keys}
+                print(f"Created: {os.path.basename(filepath)}")
+
+        # Remove entries that dropped out of the feed, and files from before the manifest
+        live_outputs = {entry["output"] for entry in current.values()}
+        for stale in sorted(existing_files - live_outputs):
+            os.remove(os.path.join(content_dir, stale))
+            instrumentation.count("files_removed")
+        for key, entry in previous.items():
+            if key not in current:
+                index.release(entry.get("keys", []), owner)
+        save_manifest(content_dir, member, current, source)
 
     if successful_conversions == 0:
         print(f"No RSS entries could be successfully converted for {member['author']}")
@@ -980,43 +1243,82 @@ def get_pelican(member, force_refresh=False):
         return False
 
     # Set up paths
-    sources_dir = os.path.join(script_dir, SOURCES_DIR, domain)
     content_dir = os.path.join(script_dir, OUTPUT_BASE_DIR, domain)
 
-    # Check if already processed (skip if content directory already exists)
-    if os.path.exists(content_dir):
-        if not force_refresh:
-            print(f"Content directory already exists for {member['author']}, skipping...")
-            return True
-        shutil.rmtree(content_dir)
-
-    # Clone the repository
-    if not clone_git_repo(clone_url, sources_dir):
-        return False
+    # Check if already processed (skip if content directory already exists).
+    # With --force the posts are re-synced, but only changed files get processed again.
+    if os.path.exists(content_dir) and not force_refresh:
+        print(f"Content directory already exists for {member['author']}, skipping...")
+        return True
 
-    # Copy markdown files from the posts path to our content directory
-    source_posts_dir = os.path.join(sources_dir, posts_path.lstrip('/') if posts_path else '')
-    copied_files = copy_markdown_files(source_posts_dir, content_dir)
+    # Skip fetching and processing entirely if the repo hasn't moved since the last sync
+    source = {"repo": clone_url, "posts_path": posts_path, "commit": get_remote_head(clone_url)}
+    post_count = None
+    if source["commit"]:
+        post_count = reuse_synced_posts(content_dir, member, source, f"git:{member['author']}", PRIORITY_GIT)
+    if post_count is not None:
+        instrumentation.count("repos_unchanged")
+        print(f"Repo unchanged at {source['commit'][:12]}, keeping {post_count} posts for {member['author']}")
+        return True
 
-    if not copied_files:
-        print(f"No markdown files found to copy for {member['author']}")
-        # Clean up the sources directory even if no files were found
-        cleanup_sources_directory(sources_dir, member['author'])
+    # Update the mirror and list the posts under the posts path
+    git_posts = load_git_posts(clone_url, posts_path)
+    if git_posts is None:
         return False
 
-    # Process each copied file to update metadata and image paths
-    author_name = member.get("author", "Unknown")
-    author_url = member.get("url", "")
+    # Write new and changed posts straight from the mirror, updating metadata and image paths
+    posts, read_posts = git_posts
+    with instrumentation.span("convert"):
+        post_count, converted, removed = sync_markdown_files(
+            posts, read_posts, content_dir, member, convert_pelican_post, remove_failed=False, source=source)
 
-    for file_path in copied_files:
-        process_pelican_metadata(file_path, author_name, author_url, domain)
+    if post_count == 0:
+        print(f"No markdown files found to copy for {member['author']}")
+        return False
 
-    print(f"Successfully processed {len(copied_files)} posts for {member['author']}")
+    print(f"{post_count} posts for {member['author']} ({converted} processed, {removed} removed)")
+    return True
 
-    # Clean up the sources directory after successful processing
-    cleanup_sources_directory(sources_dir, member['author'])
 
-    return True
+def member_feeds(members):
+    """
+    The RSS feed of every member that has one, in the feed list format rss_scraper.py uses.
+    """
+    feed_list = []
+    for member in members:
+        if member.get("type") == "rss":
+            rss_url = member.get("posts", "") or member.get("rss", "")
+        else:
+            rss_url = member.get("rss", "")
+        if rss_url:
+            feed_list.append({
+                "name": member.get("name") or member.get("author", ""),
+                "url": rss_url,
+                "author": member.get("author", ""),
+                "homepage": member.get("url", ""),
+            })
+    return feed_list
+
+
+def aggregate_member_feeds(members):
+    """
+    Update the aggregated posts (rss_scraper.py's store and aggregated_posts.json) from every
+    member's feed, read through the same feed reader as the RSS members so no feed is
+    fetched or parsed twice. Returns the number of posts exported.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    output_file = os.path.join(script_dir, rss_scraper.OUTPUT_FILE)
+    aggregator = rss_scraper.RSSAggregator(MEMBERS_JSON_URL, reader=get_feed_reader(),
+                                           store_file=os.path.join(script_dir, rss_scraper.STORE_FILE),
+                                           output_file=output_file)
+    try:
+        aggregator.aggregate_feeds(member_feeds(members))
+        aggregator.save_to_json()
+        total = aggregator.store.count()
+        print(f"Aggregated {total} posts into {output_file}")
+        return total
+    finally:
+        aggregator.store.close()
 
 
 def load_members_json(use_remote=True):
@@ -1029,7 +1331,7 @@ def load_members_json(use_remote=True):
     if use_remote:
         try:
             print(f"Fetching members.json from: {MEMBERS_JSON_URL}")
-            with urllib.request.urlopen(MEMBERS_JSON_URL) as response:
+            with fetcher.urlopen(MEMBERS_JSON_URL) as response:
                 data = json.loads(response.read().decode())
             print("Successfully loaded remote members.json")
             return data
@@ -1052,6 +1354,103 @@ def load_members_json(use_remote=True):
         return None
 
 
+def get_member_host(member):
+    """
+    Return the host a member's work will hit, used to cap concurrent requests per host.
+    Git members hit their forge (github.com/gitlab.com), RSS members hit their feed's host.
+    """
+    if member.get("type") == "rss":
+        source_url = member.get("posts", "") or member.get("rss", "")
+    else:
+        source_url = member.get("posts", "")
+    return urlparse(source_url).netloc or urlparse(member.get("url", "")).netloc or "unknown"
+
+
+class HostLimiter:
+    """
+    Hands out a per-host semaphore so no single host gets more than `per_host` concurrent jobs.
+    """
+    def __init__(self, per_host):
+        self.per_host = max(1, per_host)
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def for_host(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+
+def select_member_handler(member_type, args):
+    """
+    Return the get_* function for a member type, or None if the CLI filters exclude it.
+    """
+    if member_type == "rss" and (args.rss_only or (not args.pelican_only and not args.hugo_only)):
+        return get_rss
+    if member_type == "pelican" and not args.hugo_only and not args.rss_only:
+        return get_pelican
+    if member_type == "hugo" and not args.pelican_only and not args.rss_only:
+        return get_hugo
+    return None
+
+
+def run_member(handler, member, force_refresh, limiter):
+    """
+    Run a single member's handler under its host's concurrency cap.
+    Returns (succeeded, error_message, elapsed_seconds).
+    """
+    started = datetime.now()
+    host_slot = limiter.for_host(get_member_host(member))
+    with instrumentation.member_context(member.get("author", "Unknown")):
+        # Time spent waiting behind other members on the same host
+        with instrumentation.span("host_wait"):
+            host_slot.acquire()
+        try:
+            with instrumentation.span("member"):
+                succeeded = bool(handler(member, force_refresh=force_refresh))
+            error = None
+        except Exception as e:
+            succeeded = False
+            error = str(e)
+        finally:
+            host_slot.release()
+    elapsed = (datetime.now() - started).total_seconds()
+    return succeeded, error, elapsed
+
+
+def print_run_summary(results):
+    """
+    Print a per-member summary in contributors.json order, regardless of completion order.
+    """
+    if not results:
+        return
+    print("\nRun summary:")
+    for i, author, member_type, succeeded, error, elapsed in sorted(results):
+        status = "ok" if succeeded else "failed"
+        line = f"  {i:>3}. {author} ({member_type}): {status} in {elapsed:.1f}s"
+        if error:
+            line += f" - {error}"
+        print(line)
+
+
+def write_run_report(trace_path=None):
+    """
+    Write the run's per-member, per-stage timings and counters to RUN_REPORT_FILE,
+    next to aggregated_posts.json, plus a Chrome trace if a path is given.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    report_path = os.path.join(script_dir, RUN_REPORT_FILE)
+    try:
+        instrumentation.tracker.write_report(report_path)
+        print(f"Run report written to {report_path}")
+        if trace_path:
+            instrumentation.tracker.write_chrome_trace(trace_path)
+            print(f"Chrome trace written to {trace_path}")
+    except OSError as e:
+        print(f"Warning: Could not write run report: {e}")
+
+
 def main():
     """
     Main function to process the members.json file and handle Pelican blogs.
@@ -1072,10 +1471,28 @@ def main():
                        help='Process only RSS feeds')
     parser.add_argument('--local', action='store_true',
                        help='Use local members.json file instead of remote URL')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                       help=f'Number of members to process concurrently (default: {DEFAULT_JOBS})')
+    parser.add_argument('--jobs-per-host', type=int, default=DEFAULT_JOBS_PER_HOST,
+                       help=f'Maximum concurrent members hitting the same host (default: {DEFAULT_JOBS_PER_HOST})')
+    parser.add_argument('--convert-workers', type=int, default=DEFAULT_CONVERT_WORKERS,
+                       help=f'Number of processes converting posts (default: {DEFAULT_CONVERT_WORKERS})')
+    parser.add_argument('--no-cover-thumbnails', action='store_true',
+                       help='Hotlink cover images instead of making local thumbnails (thumbnails need Pillow)')
+    parser.add_argument('--aggregate', action='store_true',
+                       help='Also update aggregated_posts.json from the same feed fetches')
+    parser.add_argument('--max-rss-entries', type=int, default=None,
+                       help='Stop reading each RSS feed after this many entries (default: all)')
+    parser.add_argument('--trace', metavar='PATH',
+                       help='Also write a Chrome trace of every member and stage to PATH')
     args = parser.parse_args()
 
+    instrumentation.tracker.reset()
+    fetcher.load_circuit_breaker(os.path.join(os.path.dirname(os.path.abspath(__file__)), CIRCUIT_BREAKER_FILE))
+
     # Load members data
-    data = load_members_json(use_remote=not args.local)
+    with instrumentation.span("load_members"):
+        data = load_members_json(use_remote=not args.local)
     if data is None:
         return
 
@@ -1088,29 +1505,70 @@ def main():
     if args.force:
         print("Force refresh enabled - will re-process existing content")
 
-    # Process each member
-    processed_count = 0
+    # Work out which members to process and describe them up front, in order. Feed members
+    # run after every git member, so posts from members' repos have claimed their keys
+    # before a feed carrying the same articles is written.
+    git_jobs = []
+    feed_jobs = []
     for i, member in enumerate(feeds, 1):
         info = get_member_type_info(member)
+        handler = select_member_handler(info["type"], args)
 
-        if info["type"] == "rss" and (args.rss_only or (not args.pelican_only and not args.hugo_only)):
+        if handler is get_rss:
             print(f'Member {i} is "{info["author"]}" which {info["action_description"]}')
-            # Process RSS feeds
-            if get_rss(member, force_refresh=args.force):
-                processed_count += 1
-        elif info["type"] == "pelican" and not args.hugo_only and not args.rss_only:
-            print(f'Member {i} is "{info["author"]}" {info["action_description"]}')
-            # Process Pelican blogs
-            if get_pelican(member, force_refresh=args.force):
-                processed_count += 1
-        elif info["type"] == "hugo" and not args.pelican_only and not args.rss_only:
-            print(f'Member {i} is "{info["author"]}" {info["action_description"]}')
-            # Process Hugo blogs
-            if get_hugo(member, force_refresh=args.force):
-                processed_count += 1
-        elif not args.pelican_only and not args.hugo_only and not args.rss_only:
+        elif handler is not None or (not args.pelican_only and not args.hugo_only and not args.rss_only):
             print(f'Member {i} is "{info["author"]}" {info["action_description"]}')
 
+        jobs = feed_jobs if handler is get_rss else git_jobs
+        if handler is get_rss and args.max_rss_entries:
+            handler = functools.partial(get_rss, max_entries=args.max_rss_entries)
+        if handler is not None:
+            jobs.append((i, member, info, handler))
+    jobs = git_jobs + feed_jobs
+
+    # Process each member, concurrently if --jobs > 1
+    limiter = HostLimiter(args.jobs_per_host)
+    jobs_count = max(1, args.jobs)
+    if jobs_count > 1 and len(jobs) > 1:
+        print(f"Processing {len(jobs)} members with {jobs_count} workers ({limiter.per_host} per host)")
+
+    configure_cover_thumbnails(not args.no_cover_thumbnails)
+    if not args.no_cover_thumbnails and get_cover_cache() is None:
+        print("Pillow is not installed, cover images will be hotlinked")
+
+    if args.convert_workers > 1:
+        print(f"Converting posts with {args.convert_workers} processes")
+    start_convert_pool(args.convert_workers)
+
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=jobs_count) as executor:
+            for phase in (git_jobs, feed_jobs):
+                futures = {
+                    executor.submit(run_member, handler, member, args.force, limiter): (i, info)
+                    for i, member, info, handler in phase
+                }
+                for future, (i, info) in futures.items():
+                    succeeded, error, elapsed = future.result()
+                    results.append((i, info["author"], info["type"], succeeded, error, elapsed))
+    finally:
+        stop_convert_pool()
+        get_post_index().save()
+
+    # Every member's posts are on disk now, so any thumbnail they don't reference is stale
+    with instrumentation.span("covers"):
+        remove_unused_covers()
+
+    # The aggregated posts come from the feeds already read above, plus any git members' feeds
+    if args.aggregate:
+        print("\nAggregating member feeds")
+        with instrumentation.span("aggregate"):
+            aggregate_member_feeds(feeds)
+
+    processed_count = sum(1 for result in results if result[3])
+    print_run_summary(results)
+    write_run_report(args.trace)
+
     if args.hugo_only:
         blog_type = "Hugo"
     elif args.pelican_only:
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Lightweight timing and counters for the aggregation pipeline.
+
+Code marks work with `span("stage")` blocks and `count("counter", n)` calls. Both are
+attributed to whichever member is being processed, set with `member_context(name)`,
+so the same helpers work from worker threads and asyncio tasks. At the end of a run
+the collected data is written out as a JSON report and, optionally, a Chrome trace
+(open it in chrome://tracing or https://ui.perfetto.dev).
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+
+_current_member = contextvars.ContextVar('current_member', default=None)
+
+
+class Instrumentation:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a fresh run, dropping anything recorded so far."""
+        with self._lock:
+            self.started_at = datetime.now()
+            self._origin = time.perf_counter()
+            self.spans = []
+            self.counters = {}
+
+    @contextlib.contextmanager
+    def member_context(self, member):
+        """Attribute spans and counters inside this block to a member."""
+        token = _current_member.set(member)
+        try:
+            yield
+        finally:
+            _current_member.reset(token)
+
+    @contextlib.contextmanager
+    def span(self, stage):
+        """Time a block of work as a stage of the current member."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter()
+            record = {
+                'stage': stage,
+                'member': _current_member.get(),
+                'start': started - self._origin,
+                'duration': ended - started,
+                'thread': threading.get_ident(),
+            }
+            with self._lock:
+                self.spans.append(record)
+
+    def count(self, counter, value=1):
+        """Add to a counter for the current member."""
+        key = (_current_member.get(), counter)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def report(self):
+        """Summarise the run: seconds per stage and counters, overall and per member."""
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+
+        members = {}
+        stages = {}
+        totals = {}
+
+        def member_entry(member):
+            return members.setdefault(member or '(run)', {'stages': {}, 'counters': {}})
+
+        for record in spans:
+            entry = member_entry(record['member'])
+            entry['stages'][record['stage']] = entry['stages'].get(record['stage'], 0) + record['duration']
+            stages[record['stage']] = stages.get(record['stage'], 0) + record['duration']
+
+        for (member, counter), value in counters.items():
+            entry = member_entry(member)
+            entry['counters'][counter] = value
+            totals[counter] = totals.get(counter, 0) + value
+
+        def rounded(timings):
+            return {stage: round(seconds, 4) for stage, seconds in sorted(timings.items())}
+
+        return {
+            'generated_at': self.started_at.isoformat(),
+            'total_seconds': round(time.perf_counter() - self._origin, 4),
+            'stages': rounded(stages),
+            'counters': dict(sorted(totals.items())),
+            'members': {
+                member: {'stages': rounded(entry['stages']), 'counters': dict(sorted(entry['counters'].items()))}
+                for member, entry in sorted(members.items())
+            },
+        }
+
+    def write_report(self, path):
+        """Write the run summary as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+            f.write('\n')
+
+    def write_chrome_trace(self, path):
+        """Write every span as a Chrome trace event, one row per worker thread."""
+        with self._lock:
+            spans = list(self.spans)
+        thread_ids = {}
+        events = []
+        for record in sorted(spans, key=lambda record: record['start']):
+            tid = thread_ids.setdefault(record['thread'], len(thread_ids) + 1)
+            events.append({
+                'name': record['stage'],
+                'cat': record['member'] or 'run',
+                'ph': 'X',
+                'ts': round(record['start'] * 1e6),
+                'dur': round(record['duration'] * 1e6),
+                'pid': os.getpid(),
+                'tid': tid,
+                'args': {'member': record['member']},
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+# The pipeline scripts share one instance per process
+tracker = Instrumentation()
+member_context = tracker.member_context
+span = tracker.span
+count = tracker.count
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Stable identity for posts, so the same article is only aggregated once.
+
+Every post gets a list of keys: its normalised URL, its feed GUID, and a hash of its
+title and publication day. Two posts sharing a URL or GUID are the same article,
+whichever source they came from (a member's git repo, their RSS feed, or someone else's
+feed). The title and day only match a post that has no URL or GUID to go by, such as a
+post from a git repo: two feed entries with different links are different posts even if
+they share a title and day (several "Untitled" entries, or two same-named posts).
+PostIndex remembers which source owns each key between runs, so a duplicate can be
+dropped before it's converted or written.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+TRACKING_PARAM = re.compile(r'^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref)$')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+DAY_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+TITLE_KEY_PREFIX = 'post:'
+
+# Git repos hold the member's actual posts, so they win over feed copies of them
+PRIORITY_FEED = 0
+PRIORITY_GIT = 1
+
+
+def normalize_url(url):
+    """
+    Reduce a post URL to a canonical form: no scheme, lower-case host without "www.",
+    no default port, fragment, tracking parameters or trailing slash / index page.
+    Returns None if it isn't an absolute URL.
+    """
+    try:
+        parsed = urlsplit(url.strip())
+        port = parsed.port
+    except ValueError:
+        return None
+    if not parsed.hostname:
+        return None
+
+    host = parsed.hostname.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port != DEFAULT_PORTS.get(parsed.scheme.lower()):
+        host = f"{host}:{port}"
+
+    path = re.sub(r'/{2,}', '/', parsed.path)
+    path = re.sub(r'/index\.html?$', '/', path).rstrip('/')
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not TRACKING_PARAM.match(name)
+    ))
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def post_keys(title=None, date=None, link=None, guid=None):
+    """
+    Return the identity keys for a post, most specific first. date can be any string
+    containing a YYYY-MM-DD day; the title key is only made when there is one.
+    """
+    keys = []
+    link_url = normalize_url(link) if link else None
+    if link_url:
+        keys.append(f"url:{link_url}")
+    if guid:
+        guid_url = normalize_url(guid)
+        keys.append(f"url:{guid_url}" if guid_url else f"guid:{guid.strip()}")
+
+    day = DAY_PATTERN.search(date or '')
+    words = ' '.join(re.findall(r'\w+', (title or '').lower()))
+    if words and day:
+        digest = hashlib.sha1(f"{words}|{day.group()}".encode('utf-8')).hexdigest()[:16]
+        keys.append(f"{TITLE_KEY_PREFIX}{digest}")
+
+    return list(dict.fromkeys(keys))
+
+
+def is_anchored(keys):
+    """True if keys include a URL or GUID, so the post isn't matched on its title and day alone."""
+    return any(not key.startswith(TITLE_KEY_PREFIX) for key in keys)
+
+
+def keys_match(key, anchored, held_anchored):
+    """
+    Whether a post holding key (anchored or not) is the same as the one already holding it:
+    always for URLs and GUIDs, and for the title and day only if either post has nothing better.
+    """
+    return not (key.startswith(TITLE_KEY_PREFIX) and anchored and held_anchored)
+
+
+class SeenPosts:
+    """
+    The posts seen so far in one pass, to drop duplicates within a run by the same rules
+    as PostIndex.
+    """
+
+    def __init__(self):
+        self._keys = {}
+
+    def add(self, keys):
+        """Record a post's keys. Returns False, recording nothing, if it's a post already seen."""
+        anchored = is_anchored(keys)
+        if any(key in self._keys and keys_match(key, anchored, self._keys[key]) for key in keys):
+            return False
+        for key in keys:
+            self._keys.setdefault(key, anchored)
+        return True
+
+
+class PostIndex:
+    """
+    Which source owns each post key. Sources are identified by an owner string
+    (e.g. "rss:Author Name"); a matching key (see keys_match) held by a different owner
+    at the same or higher priority makes a post a duplicate. Without a path the index
+    only lives for the run.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self):
+        """Load the index, starting empty if the file is missing or corrupt."""
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save(self):
+        """Write the index atomically, if anything changed."""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def _conflict(self, keys, owner, priority, anchored):
+        """The entry of another owner holding a matching key at the same or a higher priority, or None."""
+        for key in keys:
+            held = self._entries.get(key)
+            if held and held['owner'] != owner and held['priority'] >= priority and keys_match(
+                    key, anchored, held.get('anchored', False)):
+                return held
+        return None
+
+    def conflicting_owner(self, keys, owner, priority=PRIORITY_FEED):
+        """Return the other owner that would stop owner claiming keys, or None if it can claim them."""
+        with self._lock:
+            held = self._conflict(keys, owner, priority, is_anchored(keys))
+        return held['owner'] if held else None
+
+    def claim(self, keys, owner, priority=PRIORITY_FEED):
+        """
+        Take ownership of a post's keys. Returns False, claiming nothing, if another
+        owner already holds any of them at the same or a higher priority. A title key
+        shared by two different posts stays with whoever held it first.
+        """
+        anchored = is_anchored(keys)
+        entry = {'owner': owner, 'priority': priority, 'anchored': anchored}
+        with self._lock:
+            if self._conflict(keys, owner, priority, anchored):
+                return False
+            for key in keys:
+                held = self._entries.get(key)
+                if held and held['owner'] != owner and held['priority'] >= priority:
+                    continue
+                if held != entry:
+                    self._entries[key] = entry
+                    self._dirty = True
+            return True
+
+    def release(self, keys, owner):
+        """Give up an owner's keys, e.g. when the post is deleted from its source."""
+        with self._lock:
+            for key in keys:
+                if self._entries.get(key, {}).get('owner') == owner:
+                    del self._entries[key]
+                    self._dirty = True
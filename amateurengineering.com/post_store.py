@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed store for aggregated feed posts.
+
+Posts are upserted by their identity (see post_index.post_keys), so each run only
+touches the posts that are new or changed, and the store keeps growing into an archive
+rather than being rebuilt from scratch. Queries go through indexes on the post date,
+author and blog, and the JSON export streams rows straight from the database instead
+of building one big list in memory.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from posts import Post
+
+
+# Columns in the order they appear in each exported post
+POST_FIELDS = (
+    'id', 'date_posted', 'date_posted_timestamp', 'title', 'url', 'summary',
+    'author_name', 'author_homepage', 'blog_name', 'feed_url',
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    date_posted TEXT NOT NULL,
+    date_posted_timestamp INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    author_name TEXT NOT NULL DEFAULT '',
+    author_homepage TEXT NOT NULL DEFAULT '',
+    blog_name TEXT NOT NULL DEFAULT '',
+    feed_url TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS posts_by_date ON posts (date_posted_timestamp DESC);
+CREATE INDEX IF NOT EXISTS posts_by_author ON posts (author_name, date_posted_timestamp DESC);
+CREATE INDEX IF NOT EXISTS posts_by_blog ON posts (blog_name, date_posted_timestamp DESC);
+DROP INDEX IF EXISTS posts_by_feed;
+"""
+
+
+class PostStore:
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def count(self):
+        return self.connection.execute('SELECT COUNT(*) FROM posts').fetchone()[0]
+
+    def upsert_posts(self, posts):
+        """
+        Insert new Posts and update changed ones, keyed on the post id.
+        Returns the number of rows inserted or changed.
+        """
+        columns = ', '.join(POST_FIELDS)
+        placeholders = ', '.join(f':{field}' for field in POST_FIELDS)
+        updates = ', '.join(f'{field} = excluded.{field}' for field in POST_FIELDS if field != 'id')
+        changed_if = ' OR '.join(f'{field} IS NOT excluded.{field}' for field in POST_FIELDS if field != 'id')
+        rows = (post.to_aggregated() for post in posts)
+        with self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                f'INSERT INTO posts ({columns}) VALUES ({placeholders}) '
+                f'ON CONFLICT(id) DO UPDATE SET {updates} WHERE {changed_if}',
+                rows,
+            )
+            return self.connection.total_changes - before
+
+    def remove_feeds_except(self, feed_urls):
+        """Delete the posts of any feed that's no longer in the feed list. Returns the number removed."""
+        feed_urls = list(feed_urls)
+        with self.connection:
+            self.connection.execute('CREATE TEMP TABLE IF NOT EXISTS active_feeds (url TEXT PRIMARY KEY)')
+            self.connection.execute('DELETE FROM active_feeds')
+            self.connection.executemany('INSERT OR IGNORE INTO active_feeds VALUES (?)', ((url,) for url in feed_urls))
+            return self.connection.execute(
+                'DELETE FROM posts WHERE feed_url NOT IN (SELECT url FROM active_feeds)').rowcount
+
+    def iter_posts(self, author=None, blog=None, feed_url=None, since=None, until=None, limit=None):
+        """
+        Yield stored posts as dicts, newest first, optionally filtered by author, blog,
+        feed and a date_posted_timestamp window (since inclusive, until exclusive).
+        """
+        conditions = []
+        params = []
+        for column, value in (('author_name', author), ('blog_name', blog), ('feed_url', feed_url)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        if since is not None:
+            conditions.append('date_posted_timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('date_posted_timestamp < ?')
+            params.append(until)
+
+        query = f'SELECT {", ".join(POST_FIELDS)} FROM posts'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY date_posted_timestamp DESC, id'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        for row in self.connection.execute(query, params):
+            yield dict(row)
+
+    def date_range(self):
+        """Return the (oldest, newest) date_posted in the store, or (None, None) if it's empty."""
+        row = self.connection.execute(
+            'SELECT MIN(date_posted_timestamp), MAX(date_posted_timestamp) FROM posts').fetchone()
+        if row[0] is None:
+            return None, None
+        oldest = self.connection.execute(
+            'SELECT date_posted FROM posts WHERE date_posted_timestamp = ? LIMIT 1', (row[0],)).fetchone()[0]
+        newest = self.connection.execute(
+            'SELECT date_posted FROM posts WHERE date_posted_timestamp = ? LIMIT 1', (row[1],)).fetchone()[0]
+        return oldest, newest
+
+    def export_json(self, filename, **filters):
+        """
+        Write the posts out in the aggregated_posts.json format, one row at a time,
+        through a temporary file so readers never see a half-written export.
+        Takes the same filters as iter_posts. Returns the number of posts written.
+        """
+        tmp_path = f"{filename}.tmp"
+        total = 0
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('{\n')
+            f.write(f'  "generated_at": {json.dumps(datetime.now().isoformat())},\n')
+            f.write('  "posts": [')
+            for post in self.iter_posts(**filters):
+                post_json = json.dumps(post, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+                f.write(f'{"," if total else ""}\n    {post_json}')
+                total += 1
+            f.write('\n  ],\n' if total else '],\n')
+            f.write(f'  "total_posts": {total}\n}}\n')
+        os.replace(tmp_path, filename)
+        return total
+
+    def import_json(self, filename):
+        """Load posts from an aggregated_posts.json export, e.g. to seed a new store. Returns the number loaded."""
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                posts = json.load(f).get('posts', [])
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+        return self.upsert_posts(Post.from_aggregated(post) for post in posts)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+The post record shared by every stage of the pipeline.
+
+Posts from members' git repos (Pelican and Hugo), feed entries and aggregated posts
+all travel as a Post: feeds.py parses entries into them, the converters build one
+from a post's front matter, and the aggregator fills in the blog it came from. Post
+uses __slots__, so the thousands held at once by the feed reader and the aggregator
+cost a fraction of the dicts they replace, and it renders itself straight to Pelican
+metadata and to the JSON the feed cache and aggregated_posts.json use.
+"""
+
+from datetime import datetime, timezone
+
+from frontmatter import PostMetadata, format_pelican_metadata
+from post_index import post_keys
+
+
+# Pelican metadata a Post sets itself; any other front matter field is kept in Post.extra
+PELICAN_FIELDS = {
+    'title', 'date', 'modified', 'author', 'authorurl', 'category', 'tags', 'summary', 'status',
+    'source', 'original-url',
+}
+
+
+class Post:
+    """
+    One post, whatever its source.
+
+    date is an aware datetime when it was parsed from a feed, or the date string from a
+    post's front matter as written (Pelican and Hugo are left to interpret those).
+    author and author_url are the member the post is aggregated under; blog and feed_url
+    are only set for aggregated feed posts. extra is a dict of any other Pelican
+    metadata (e.g. Slug, or the Cover fields), in order, or None.
+    """
+
+    __slots__ = ('title', 'date', 'url', 'guid', 'content', 'summary', 'author', 'author_url',
+                 'blog', 'feed_url', 'modified', 'tags', 'status', 'source', 'extra')
+
+    def __init__(self, title='', date=None, url='', guid='', content='', summary='', author='',
+                 author_url='', blog='', feed_url='', modified='', tags=(), status='', source='',
+                 extra=None):
+        self.title = title
+        self.date = date
+        self.url = url
+        self.guid = guid
+        self.content = content
+        self.summary = summary
+        self.author = author
+        self.author_url = author_url
+        self.blog = blog
+        self.feed_url = feed_url
+        self.modified = modified
+        self.tags = tags
+        self.status = status
+        self.source = source
+        self.extra = extra
+
+    def __repr__(self):
+        return f"Post({self.title!r}, {self.date!r}, {self.url!r})"
+
+    def replace(self, **changes):
+        """A copy of the post with some fields changed, leaving this one (e.g. a shared feed entry) alone."""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return Post(**fields)
+
+    @classmethod
+    def from_metadata(cls, metadata, **fields):
+        """
+        A post from parsed Pelican front matter (a frontmatter.PostMetadata), keeping
+        every field it doesn't set itself in extra. fields override what's read.
+        """
+        post = cls(
+            title=metadata.title,
+            date=metadata.date or None,
+            modified=metadata.modified,
+            summary=metadata.text('summary'),
+            author=metadata.text('author'),
+            author_url=metadata.text('authorurl'),
+            tags=metadata.tags,
+            status=metadata.text('status'),
+            source=metadata.text('source'),
+            url=metadata.text('original-url'),
+            extra={key: value for key, value in metadata.fields.items() if key.lower() not in PELICAN_FIELDS},
+        )
+        for name, value in fields.items():
+            setattr(post, name, value)
+        return post
+
+    @property
+    def day(self):
+        """The YYYY-MM-DD the post was published, as the source has it, or None."""
+        if isinstance(self.date, datetime):
+            return self.date.date().isoformat()
+        return self.date[:10] if self.date else None
+
+    @property
+    def utc_date(self):
+        """The publication time as an aware UTC datetime, or None if it isn't known (or isn't parsed)."""
+        return self.date.astimezone(timezone.utc) if isinstance(self.date, datetime) else None
+
+    @property
+    def timestamp(self):
+        utc_date = self.utc_date
+        return int(utc_date.timestamp()) if utc_date else 0
+
+    def keys(self):
+        """Identity keys (see post_index.post_keys), shared with the same post from any other source."""
+        return post_keys(self.title, self.day, self.url, self.guid)
+
+    def pelican_metadata(self, order=()):
+        """
+        The post's Pelican metadata. Fields named in order (matched case-insensitively, any
+        extra ones included) come first, in that order, so a converter can keep the layout
+        its posts have always had; the rest follow in the default order, then extra.
+        Posts are categorised by the member they come from, and dates keep their UTC
+        offset when they have one.
+        """
+        date = self.date
+        if isinstance(date, datetime):
+            date = date.isoformat(sep=' ', timespec='minutes')
+        fields = {'Title': self.title, 'Date': date or ''}
+        for key, value in (
+                ('Modified', self.modified),
+                ('Author', self.author),
+                ('AuthorURL', self.author_url),
+                ('Category', self.author),
+                ('Tags', ', '.join(self.tags)),
+                ('Summary', self.summary),
+                ('Status', self.status),
+                ('Source', self.source),
+                ('Original-URL', self.url)):
+            if value:
+                fields[key] = value
+        fields.update(self.extra or {})
+
+        by_name = {key.lower(): key for key in fields}
+        metadata = PostMetadata({}, 'pelican')
+        for name in order:
+            key = by_name.pop(name.lower(), None)
+            if key is not None:
+                metadata.set(key, fields[key])
+        for key in by_name.values():
+            metadata.set(key, fields[key])
+        return metadata.fields
+
+    def to_pelican(self, body, order=()):
+        """Render the post as a Pelican markdown file with the given body (see pelican_metadata for order)."""
+        return f"{format_pelican_metadata(self.pelican_metadata(order))}\n\n{body}"
+
+    def to_dict(self):
+        """The post as a JSON-ready dict, leaving out empty fields. Round-trips through from_dict."""
+        data = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value:
+                data[name] = value.isoformat() if isinstance(value, datetime) else value
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """A post from to_dict's output. Dates with a time are parsed back into datetimes."""
+        post = cls(**data)
+        if post.date and 'T' in post.date:
+            post.date = datetime.fromisoformat(post.date)
+        return post
+
+    def to_aggregated(self):
+        """
+        The post in aggregated_posts.json's format (see post_store.POST_FIELDS), with
+        the date in UTC.
+        """
+        utc_date = self.utc_date
+        return {
+            'id': self.keys()[0],
+            'date_posted': utc_date.replace(tzinfo=None).isoformat() if utc_date else '',
+            'date_posted_timestamp': self.timestamp,
+            'title': self.title,
+            'url': self.url,
+            'summary': self.summary,
+            'author_name': self.author,
+            'author_homepage': self.author_url,
+            'blog_name': self.blog,
+            'feed_url': self.feed_url,
+        }
+
+    @classmethod
+    def from_aggregated(cls, data):
+        """A post from one of aggregated_posts.json's posts, e.g. when seeding a new store."""
+        date = data.get('date_posted')
+        return cls(
+            title=data.get('title', ''),
+            date=datetime.fromisoformat(date).replace(tzinfo=timezone.utc) if date else None,
+            url=data.get('url', ''),
+            summary=data.get('summary', ''),
+            author=data.get('author_name', ''),
+            author_url=data.get('author_homepage', ''),
+            blog=data.get('blog_name', ''),
+            feed_url=data.get('feed_url', ''),
+        )
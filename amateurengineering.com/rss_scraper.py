@@ -5,13 +5,22 @@ Fetches RSS feeds from a GitHub-hosted JSON list and extracts post details
 """
 
 import json
+import asyncio
+import contextlib
+import heapq
+import itertools
 import requests
-import feedparser
-from datetime import datetime
-from urllib.parse import urljoin, urlparse
-import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
 import logging
 
+import fetcher
+import instrumentation
+from feeds import FeedReader, make_session, summarize
+from post_index import SeenPosts
+from post_store import PostStore
+from posts import Post
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -19,21 +28,103 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+OUTPUT_FILE = 'aggregated_posts.json'
+STORE_FILE = 'aggregated_posts.db'
+FEED_CACHE_DIR = '.aggregator_feeds'
+CIRCUIT_BREAKER_FILE = '.aggregator_circuit_breaker.json'
+RUN_REPORT_FILE = 'aggregator_run_report.json'
+
+# Fetch politeness: how many feeds to download at once overall and per host,
+# and the minimum gap between starting two requests to the same host
+MAX_CONCURRENT_FETCHES = 16
+PER_HOST_CONCURRENCY = 2
+PER_HOST_DELAY = 0.5
+# How many of the newest posts main() merges and prints
+LATEST_POSTS_SHOWN = 5
+
+
+def post_timestamp(post):
+    return post.timestamp
+
+
+def merge_newest(feed_posts, limit=None, since=None, until=None):
+    """
+    Lazily merge each feed's posts into one newest-first stream, optionally only the
+    newest `limit` posts and/or those in a UTC timestamp window (since inclusive,
+    until exclusive). Feeds are nearly always already newest-first, so this is a k-way
+    merge costing O(K log feeds) for the first K posts rather than sorting every post.
+    """
+    streams = []
+    for posts in feed_posts:
+        if since is not None or until is not None:
+            posts = [post for post in posts
+                     if (since is None or post_timestamp(post) >= since)
+                     and (until is None or post_timestamp(post) < until)]
+        if any(post_timestamp(a) < post_timestamp(b) for a, b in itertools.pairwise(posts)):
+            posts = sorted(posts, key=post_timestamp, reverse=True)
+        streams.append(posts)
+
+    merged = heapq.merge(*streams, key=post_timestamp, reverse=True)
+    return itertools.islice(merged, limit) if limit is not None else merged
+
+
+class HostRateLimiter:
+    """Async per-host concurrency cap and request spacing, replacing a global sleep between feeds."""
+
+    def __init__(self, per_host=PER_HOST_CONCURRENCY, delay=PER_HOST_DELAY):
+        self.per_host = per_host
+        self.delay = delay
+        self._semaphores = {}
+        self._next_start = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, host):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.delay
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
 
 class RSSAggregator:
-    def __init__(self, feed_list_url, max_posts_per_feed=10):
+    def __init__(self, feed_list_url, max_posts_per_feed=10, store_file=STORE_FILE, reader=None,
+                 output_file=OUTPUT_FILE):
+        """
+        Feeds are read through reader, a feeds.FeedReader, so a script that also needs the
+        feeds for something else (get_posts.py --aggregate) can share one fetch of each.
+        Without one, feeds are read over this aggregator's pooled session. output_file is
+        the JSON export, which also seeds a new store.
+        """
         self.feed_list_url = feed_list_url
         self.max_posts_per_feed = max_posts_per_feed
-        self.session = requests.Session()
+        self.output_file = output_file
+        # Keep enough pooled keep-alive connections for every concurrent fetch
+        self.session = make_session(MAX_CONCURRENT_FETCHES)
         self.session.headers.update({
             'User-Agent': 'Amateur-Engineering-RSS-Aggregator/1.0'
         })
+        self.reader = reader or FeedReader(FEED_CACHE_DIR, session=self.session)
+        self.posts_fetched = 0
+        self.store = self.open_store(store_file, output_file)
+
+    def open_store(self, filename, seed_file):
+        """Open the post store, seeding a new one from the last JSON export, seed_file."""
+        store = PostStore(filename)
+        if store.count() == 0:
+            imported = store.import_json(seed_file)
+            if imported:
+                logger.info(f"Imported {imported} posts from {seed_file} into {filename}")
+        return store
 
     def load_feed_list(self):
         """Load the list of feeds from GitHub JSON file."""
         try:
             logger.info(f"Loading feed list from: {self.feed_list_url}")
-            response = self.session.get(self.feed_list_url, timeout=10)
+            response = fetcher.session_get(self.session, self.feed_list_url)
             response.raise_for_status()
 
             data = response.json()
@@ -41,7 +132,7 @@ class RSSAggregator:
             logger.info(f"Loaded {len(feeds)} feeds from list")
             return feeds
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, fetcher.HostUnavailable) as e:
             logger.error(f"Failed to load feed list: {e}")
             raise
         except json.JSONDecodeError as e:
@@ -53,153 +144,160 @@ class RSSAggregator:
         parsed = urlparse(url)
         return f"{parsed.scheme}://{parsed.netloc}"
 
-    def fetch_feed(self, feed_info):
-        """Fetch and parse a single RSS/Atom feed."""
+    def extract_feed_posts(self, feed_info, feed):
+        """Turn a feed's entries (from the shared reader) into posts."""
         feed_name = feed_info.get('name', 'Unknown')
-        feed_url = feed_info.get('url')
-
-        if not feed_url:
-            logger.warning(f"No URL provided for feed: {feed_name}")
+        if feed.error:
+            logger.error(f"Failed to fetch feed {feed_name}: {feed.error}")
             return []
+        if feed.not_modified:
+            logger.info(f"Feed not modified, reusing its cached entries for {feed_name}")
 
-        try:
-            logger.info(f"Fetching feed: {feed_name} from {feed_url}")
+        posts = []
+        for entry in feed.entries:
+            post = self.extract_post_data(entry, feed_info)
+            if post:
+                posts.append(post)
 
-            # Use feedparser which handles most RSS/Atom formats and issues
-            parsed_feed = feedparser.parse(feed_url)
+        logger.info(f"Extracted {len(posts)} posts from {feed_name}")
+        instrumentation.count('posts_extracted', len(posts))
+        return posts
 
-            if parsed_feed.bozo and parsed_feed.bozo_exception:
-                logger.warning(f"Feed parsing issue for {feed_name}: {parsed_feed.bozo_exception}")
-
-            posts = []
-            entries = parsed_feed.entries[:self.max_posts_per_feed]
-
-            for entry in entries:
-                post = self.extract_post_data(entry, feed_info)
-                if post:
-                    posts.append(post)
-
-            logger.info(f"Extracted {len(posts)} posts from {feed_name}")
-            return posts
+    async def fetch_feed_async(self, feed_info, global_limit, host_limiter):
+        """Read a feed in a worker thread under the global and per-host limits, then extract its posts."""
+        feed_name = feed_info.get('name', 'Unknown')
+        feed_url = feed_info.get('url')
 
-        except Exception as e:
-            logger.error(f"Failed to fetch feed {feed_name}: {e}")
+        if not feed_url:
+            logger.warning(f"No URL provided for feed: {feed_name}")
             return []
 
+        with instrumentation.member_context(feed_name):
+            async with global_limit, host_limiter.slot(urlparse(feed_url).netloc):
+                logger.info(f"Fetching feed: {feed_name} from {feed_url}")
+                feed = await asyncio.to_thread(self.reader.read, feed_url, self.max_posts_per_feed)
+            with instrumentation.span('extract'):
+                return self.extract_feed_posts(feed_info, feed)
+
+    async def fetch_all_feeds(self, feeds):
+        """Fetch every feed concurrently, returning each feed's posts in feed list order."""
+        global_limit = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        host_limiter = HostRateLimiter()
+        return await asyncio.gather(*(
+            self.fetch_feed_async(feed_info, global_limit, host_limiter) for feed_info in feeds
+        ))
+
     def extract_post_data(self, entry, feed_info):
-        """Extract relevant data from a feed entry."""
+        """Turn a feed entry into an aggregated post, or None if it has no URL or title."""
         try:
             # Extract post URL
-            post_url = getattr(entry, 'link', '')
+            post_url = entry.url
             if not post_url:
                 return None
 
             # Extract title
-            title = getattr(entry, 'title', '').strip()
+            title = entry.title.strip()
             if not title:
                 return None
 
-            # Extract and parse date
-            published_parsed = getattr(entry, 'published_parsed', None)
-            updated_parsed = getattr(entry, 'updated_parsed', None)
-
-            post_date = None
-            if published_parsed:
-                post_date = datetime(*published_parsed[:6])
-            elif updated_parsed:
-                post_date = datetime(*updated_parsed[:6])
-            else:
+            # Dates are normalised to UTC, so posts from feeds in different timezones sort correctly
+            published = entry.date
+            if published is None:
                 # Fallback to current time if no date found
-                post_date = datetime.now()
+                published = datetime.now(timezone.utc)
                 logger.warning(f"No date found for post: {title}")
 
-            # Extract description/summary
-            description = ''
-            if hasattr(entry, 'summary'):
-                description = entry.summary
-            elif hasattr(entry, 'description'):
-                description = entry.description
-            elif hasattr(entry, 'content') and entry.content:
-                # Handle multiple content types
-                if isinstance(entry.content, list) and len(entry.content) > 0:
-                    description = entry.content[0].get('value', '')
-                else:
-                    description = str(entry.content)
-
-            # Clean up description (remove HTML tags, limit length)
-            if description:
-                import re
-                description = re.sub(r'<[^>]+>', '', description)  # Strip HTML
-                description = description.strip()
-                if len(description) > 500:
-                    description = description[:500] + '...'
-
-            # Get author info
-            author_name = feed_info.get('author', '')
-            if not author_name and hasattr(entry, 'author'):
-                author_name = entry.author
-
-            # Get homepage/base URL
-            homepage_url = self.get_base_url(feed_info.get('url', ''))
-
-            # If we have a link in the feed metadata, use that instead
+            # Homepage from the feed list, otherwise the post's site
             if 'homepage' in feed_info:
                 homepage_url = feed_info['homepage']
-            elif hasattr(entry, 'link'):
-                homepage_url = self.get_base_url(entry.link)
-
-            post_data = {
-                'date_posted': post_date.isoformat(),
-                'date_posted_timestamp': int(post_date.timestamp()),
-                'title': title,
-                'url': post_url,
-                'summary': description,
-                'author_name': author_name,
-                'author_homepage': homepage_url,
-                'blog_name': feed_info.get('name', ''),
-                'feed_url': feed_info.get('url', '')
-            }
-
-            return post_data
+            else:
+                homepage_url = self.get_base_url(post_url)
+
+            # A new post rather than the shared entry, without the content to keep big aggregates small
+            return Post(
+                title=title,
+                date=published.astimezone(timezone.utc),
+                url=post_url,
+                guid=entry.guid,
+                summary=summarize(entry.content, 500),
+                author=feed_info.get('author', '') or entry.author,
+                author_url=homepage_url,
+                blog=feed_info.get('name', ''),
+                feed_url=feed_info.get('url', ''),
+            )
 
         except Exception as e:
             logger.error(f"Error extracting post data: {e}")
             return None
 
-    def aggregate_all_feeds(self):
-        """Fetch all feeds and return aggregated post data."""
+    def remove_duplicate_posts(self, feed_posts):
+        """
+        Drop posts that are the same article as an earlier post, in feed list order: the same
+        URL or GUID, or the same title and day when one of them has neither (see post_index).
+        Takes and returns a list of posts per feed.
+        """
+        seen = SeenPosts()
+        unique_feed_posts = []
+        for posts in feed_posts:
+            unique_posts = []
+            for post in posts:
+                if not seen.add(post.keys()):
+                    logger.info(f"Skipping duplicate post: {post.title} ({post.url})")
+                    instrumentation.count('duplicates_skipped')
+                    continue
+                unique_posts.append(post)
+            unique_feed_posts.append(unique_posts)
+        return unique_feed_posts
+
+    def aggregate_all_feeds(self, limit=None, since=None, until=None):
+        """
+        Fetch all feeds in the feed list, store their posts and return an iterator over the
+        aggregated Posts, newest first. Every fetched post is stored; limit, since and until
+        only trim what's returned, and posts are only merged as the iterator is consumed
+        (see merge_newest).
+        """
         try:
-            feeds = self.load_feed_list()
-            all_posts = []
-
-            for feed_info in feeds:
-                posts = self.fetch_feed(feed_info)
-                all_posts.extend(posts)
+            with instrumentation.span('load_feed_list'):
+                feeds = self.load_feed_list()
+        except Exception as e:
+            logger.error(f"Failed to aggregate feeds: {e}")
+            return iter(())
+        return self.aggregate_feeds(feeds, limit, since, until)
+
+    def aggregate_feeds(self, feeds, limit=None, since=None, until=None):
+        """
+        Fetch the given feeds (dicts with name, url and optionally author and homepage),
+        store their posts and return an iterator over the aggregated Posts, newest first, as
+        for aggregate_all_feeds. Feeds not in the list are dropped from the store.
+        """
+        try:
+            # Downloads run concurrently, politeness is handled per host by HostRateLimiter.
+            # The same article can turn up twice in a feed or in more than one feed; keep the first
+            feed_posts = self.remove_duplicate_posts(asyncio.run(self.fetch_all_feeds(feeds)))
 
-                # Be nice to servers - small delay between requests
-                time.sleep(0.5)
+            # Only new and changed posts are written; posts from feeds dropped from the list are removed
+            with instrumentation.span('store'):
+                changed = self.store.upsert_posts(itertools.chain.from_iterable(feed_posts))
+                removed = self.store.remove_feeds_except(feed.get('url', '') for feed in feeds)
+            instrumentation.count('posts_stored', changed)
+            logger.info(f"Stored {changed} new or changed posts, removed {removed} from dropped feeds")
 
-            # Sort by date (newest first)
-            all_posts.sort(key=lambda x: x['date_posted_timestamp'], reverse=True)
+            self.posts_fetched = sum(len(posts) for posts in feed_posts)
+            logger.info(f"Total posts aggregated: {self.posts_fetched}")
 
-            logger.info(f"Total posts aggregated: {len(all_posts)}")
-            return all_posts
+            # Merged newest first as the caller reads, stopping once it has what was asked for
+            return merge_newest(feed_posts, limit, since, until)
 
         except Exception as e:
             logger.error(f"Failed to aggregate feeds: {e}")
-            return []
+            return iter(())
 
-    def save_to_json(self, posts, filename='aggregated_posts.json'):
-        """Save posts to a JSON file."""
+    def save_to_json(self, filename=None):
+        """Export every stored post to a JSON file (output_file by default), newest first."""
+        filename = filename or self.output_file
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'generated_at': datetime.now().isoformat(),
-                    'total_posts': len(posts),
-                    'posts': posts
-                }, f, indent=2, ensure_ascii=False)
-
-            logger.info(f"Saved {len(posts)} posts to {filename}")
+            total = self.store.export_json(filename)
+            logger.info(f"Saved {total} posts to {filename}")
 
         except Exception as e:
             logger.error(f"Failed to save posts to JSON: {e}")
@@ -209,25 +307,30 @@ def main():
     """Main function to run the RSS aggregator."""
     feed_list_url = "https://raw.githubusercontent.com/obsoletenerd/amateur-engineering/refs/heads/main/feeds.json"
 
-    # Initialise aggregator
+    # Initialise aggregator; hosts that keep failing are skipped for a while, across runs
+    instrumentation.tracker.reset()
+    fetcher.load_circuit_breaker(CIRCUIT_BREAKER_FILE)
     aggregator = RSSAggregator(feed_list_url)
 
-    # Fetch all posts
-    posts = aggregator.aggregate_all_feeds()
+    # Fetch and store all posts, only merging the newest few we show
+    latest_posts = list(aggregator.aggregate_all_feeds(limit=LATEST_POSTS_SHOWN))
 
-    if posts:
+    if latest_posts:
         # Save to JSON file (until API is sorted)
-        aggregator.save_to_json(posts)
+        with instrumentation.span('save'):
+            aggregator.save_to_json()
 
         # Display some stats
+        oldest, newest = aggregator.store.date_range()
         print(f"\n=== RSS Aggregation Complete ===")
-        print(f"Total posts fetched: {len(posts)}")
-        print(f"Date range: {posts[-1]['date_posted']} to {posts[0]['date_posted']}")
+        print(f"Total posts fetched: {aggregator.posts_fetched}")
+        print(f"Total posts stored: {aggregator.store.count()}")
+        print(f"Date range: {oldest} to {newest}")
 
         # Show first few posts as example
         print(f"\nLatest posts:")
-        for i, post in enumerate(posts[:5]):
-            print(f"  {i+1}. {post['title']} ({post['blog_name']})")
+        for i, post in enumerate(latest_posts):
+            print(f"  {i+1}. {post.title} ({post.blog})")
 
         # Here's where we would send to the API instead
         # send_to_api(posts) ... etc
@@ -235,6 +338,10 @@ def main():
     else:
         print("No posts were fetched.")
 
+    # Per-feed timings and counters, next to the aggregated posts
+    instrumentation.tracker.write_report(RUN_REPORT_FILE)
+    logger.info(f"Run report written to {RUN_REPORT_FILE}")
+
 
 if __name__ == "__main__":
     main()